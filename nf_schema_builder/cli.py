@@ -1,21 +1,17 @@
 """Command-line interface for nf-schema-builder."""
 
 from dataclasses import dataclass
+from functools import cache
 from pathlib import Path
 from typing import Annotated, Any, Optional
 
 import typer
-from jsonschema.exceptions import SchemaError, ValidationError
-
-from nf_schema_builder.config import ValidationConfig
-from nf_schema_builder.http import send_schema
-from nf_schema_builder.logger import log, set_debug
-from nf_schema_builder.schema import load_schema
-from nf_schema_builder.utils import check_nextflow_installation, handle_schema_errors
-from nf_schema_builder.validation import (
-    validate_json_schema,
-    validate_workflow_parameters,
-)
+
+from nf_schema_builder.logger import configure_logging, log, set_debug
+from nf_schema_builder.utils import handle_schema_errors
+
+# Heavy dependencies (aiohttp, jsonschema, yaml) are imported inside the commands that need them,
+# so that `--help` and `validate` don't pay for the web server stack at startup.
 
 app = typer.Typer(
     name="nf-schema-builder",
@@ -34,22 +30,38 @@ class CLIConfig:
     no_browser: bool = False
 
 
+@cache
+def _error_messages() -> tuple[tuple[type[Exception], str], ...]:
+    """Build the error message table once, on the first error."""
+    from jsonschema.exceptions import SchemaError, ValidationError
+
+    return (
+        (SchemaError, "Invalid schema"),
+        (ValidationError, "Invalid parameters"),
+        (FileNotFoundError, "Schema file not found"),
+        (ConnectionError, "Failed to connect to server"),
+    )
+
+
 def handle_cli_error(error: Exception) -> None:
     """Centralized error handling for CLI commands."""
-    error_messages: dict[type[Exception], str] = {
-        SchemaError: "Invalid schema",
-        ValidationError: "Invalid parameters",
-        FileNotFoundError: "Schema file not found",
-        ConnectionError: "Failed to connect to server",
-    }
-
-    message = error_messages.get(type(error), "An unexpected error occurred")
-    log.error(f"❌ {message}: {str(error)}")
+    # isinstance checks so that subclasses (e.g. ConnectionRefusedError) get the matching message
+    message = next(
+        (msg for error_type, msg in _error_messages() if isinstance(error, error_type)), "An unexpected error occurred"
+    )
+    log.error("❌ %s: %s", message, error)
     raise typer.Exit(1) from error
 
 
-def perform_validation(schema_file: Path, debug: bool = False) -> None:
-    """Perform all validation steps for a schema file."""
+def perform_validation(schema_file: Path, debug: bool = False) -> dict:
+    """Perform all validation steps for a schema file and return the schema as loaded from the file."""
+    from jsonschema.exceptions import ValidationError
+
+    from nf_schema_builder.config import ValidationConfig
+    from nf_schema_builder.schema import load_schema
+    from nf_schema_builder.utils import check_nextflow_installation
+    from nf_schema_builder.validation import validate_json_schema, validate_workflow_parameters
+
     if not check_nextflow_installation():
         raise RuntimeError(
             "Nextflow is not installed. Please install Nextflow first: "
@@ -65,6 +77,8 @@ def perform_validation(schema_file: Path, debug: bool = False) -> None:
         if invalid_params:
             raise ValidationError("One or more parameters are invalid")
 
+    return schema
+
 
 def handle_send_response(response: Any, url: str, debug: bool) -> None:
     """Handle the response from sending schema."""
@@ -79,6 +93,7 @@ def handle_send_response(response: Any, url: str, debug: bool) -> None:
 @app.callback(invoke_without_command=True)
 def main(ctx: typer.Context) -> None:
     """Handle default command when no subcommand is provided."""
+    configure_logging()
     if ctx.invoked_subcommand is None:
         ctx.invoke(send)
 
@@ -119,6 +134,8 @@ def send(
     ] = False,
 ) -> None:
     """Send schema file to URL for visualization or processing."""
+    from nf_schema_builder.http import send_schema
+
     try:
         if schema_file is None:
             schema_file = Path("nextflow_schema.json")
@@ -134,7 +151,7 @@ def send(
         # Run validation steps first
         perform_validation(config.schema_file, config.debug)
 
-        # Send schema
+        # Send schema, forwarding the file as is
         response = send_schema(config.schema_file, config.url, no_browser=config.no_browser)
         handle_send_response(response, config.url, config.debug)
 
@@ -1,17 +1,38 @@
 """Configuration handling for nf-schema-builder."""
 
-from dataclasses import dataclass, field
+import re
+from collections.abc import Mapping
+from dataclasses import InitVar, dataclass, field
+from functools import cached_property
 from pathlib import Path
+from types import MappingProxyType
+from typing import Optional
 
 from nf_schema_builder.logger import log
 from nf_schema_builder.utils import fetch_wf_config
 
+# Brackets, quotes and whitespace around the items of a Groovy list such as "['a', 'b']"
+_LIST_SYNTAX_RE = re.compile(r"[\[\]'\"\s]")
+
+# Validation plugins that determine the schema notation
+_PLUGIN_RE = re.compile(r"nf-(?:schema|validation)")
+
+
+def parse_param_list(value: str) -> frozenset[str]:
+    """Parse a comma separated (optionally Groovy list formatted) string of parameter names."""
+    return frozenset(filter(None, _LIST_SYNTAX_RE.sub("", value).split(",")))
+
 
 @dataclass
 class WorkflowConfig:
     """Class to handle workflow configuration."""
 
     _config: dict[str, str]
+    _params: dict[str, str] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Index the params entries once, so lookups don't rescan the whole config."""
+        self._params = {key: value for key, value in self._config.items() if key.startswith("params.")}
 
     @classmethod
     def from_workflow(cls, workflow_dir: Path) -> "WorkflowConfig":
@@ -23,11 +44,11 @@ class WorkflowConfig:
         """Get config value."""
         return self._config.get(key, default)
 
-    def get_params(self) -> dict[str, str]:
-        """Get all params prefixed entries."""
-        return {key: value for key, value in self._config.items() if key.startswith("params.")}
+    def get_params(self) -> Mapping[str, str]:
+        """Get all params prefixed entries as a read-only view."""
+        return MappingProxyType(self._params)
 
-    @property
+    @cached_property
     def plugins(self) -> list[str]:
         """Get list of plugins."""
         return str(self.get("plugins", "")).strip("'\"").strip(" ").split(",")
@@ -40,25 +61,27 @@ class ValidationConfig:
     validation_plugin: str = "nf-schema"  # nf-schema or nf-validation
     defs_notation: str = "$defs"  # $defs or definitions
     schema_draft: str = "https://json-schema.org/draft/2020-12/schema"
-    ignored_params: list[str] = field(default_factory=list)
+    ignored_params: frozenset[str] = field(default_factory=frozenset)
     workflow_dir: Path = field(default_factory=Path)
+    wf_config: InitVar[Optional[WorkflowConfig]] = None
     workflow_config: WorkflowConfig = field(init=False)
 
-    def __post_init__(self):
-        """Initialize workflow config."""
-        self.workflow_config = WorkflowConfig.from_workflow(self.workflow_dir)
+    def __post_init__(self, wf_config: Optional[WorkflowConfig]):
+        """Initialize workflow config, fetching it from Nextflow unless one was passed in."""
+        self.workflow_config = wf_config if wf_config is not None else WorkflowConfig.from_workflow(self.workflow_dir)
 
     @classmethod
     def from_workflow(cls, workflow_dir: Path) -> "ValidationConfig":
         """Create configuration from workflow directory."""
-        config = cls(workflow_dir=workflow_dir)
-        wf_config = config.workflow_config
+        wf_config = WorkflowConfig.from_workflow(workflow_dir)
+        config = cls(workflow_dir=workflow_dir, wf_config=wf_config)
 
         # Determine which validation plugin to use
         plugin = "nf-schema"  # default
         for plugin_instance in wf_config.plugins:
-            if any(p in plugin_instance for p in ["nf-schema", "nf-validation"]):
-                plugin = "nf-schema" if "nf-schema" in plugin_instance else "nf-validation"
+            match = _PLUGIN_RE.search(plugin_instance)
+            if match:
+                plugin = match.group(0)
                 break
         else:  # no plugin found
             log.info(
@@ -74,32 +97,27 @@ class ValidationConfig:
             config.schema_draft = "https://json-schema.org/draft/2020-12/schema"
 
             # Get ignored parameters
-            ignored_params = [
+            ignored_params = {
                 wf_config.get("validation.help.shortParameter", "help"),
                 wf_config.get("validation.help.fullParameter", "helpFull"),
                 wf_config.get("validation.help.showHiddenParameter", "showHidden"),
                 "trace_report_suffix",  # report suffix should be ignored by default as it is a Java Date object
-            ]
+            }
 
             # Add ignored parameters from config
-            ignored_params_config_str = wf_config.get("validation.defaultIgnoreParams", "")
-            if ignored_params_config_str:
-                cleaned_str = ignored_params_config_str.strip("[]'\"")
-                ignored_params_config = [
-                    item.strip().strip("'").strip('"') for item in cleaned_str.split(",") if item.strip()
-                ]
-                if ignored_params_config:
-                    log.debug(f"Ignoring parameters from config: {ignored_params_config}")
-                    ignored_params.extend(ignored_params_config)
+            ignored_params_config = parse_param_list(wf_config.get("validation.defaultIgnoreParams", ""))
+            if ignored_params_config:
+                log.debug(f"Ignoring parameters from config: {sorted(ignored_params_config)}")
+                ignored_params |= ignored_params_config
 
         else:  # nf-validation
             config.defs_notation = "definitions"
             config.schema_draft = "https://json-schema.org/draft-07/schema"
             # Get ignored parameters from pipeline params
-            ignored_params = wf_config.get("validationSchemaIgnoreParams", "").strip("\"'").split(",")
-            ignored_params.append("validationSchemaIgnoreParams")
+            ignored_params = set(parse_param_list(wf_config.get("validationSchemaIgnoreParams", "")))
+            ignored_params.add("validationSchemaIgnoreParams")
 
-        config.ignored_params = [p for p in ignored_params if p]  # Remove empty strings
-        log.debug(f"Ignoring parameters: {config.ignored_params}")
+        config.ignored_params = frozenset(p for p in ignored_params if p)  # Remove empty strings
+        log.debug(f"Ignoring parameters: {sorted(config.ignored_params)}")
 
         return config
@@ -2,28 +2,63 @@
 
 import asyncio
 import atexit
+import contextlib
+import hashlib
+import http.client
 import json
-import socket
+import logging
 import threading
-import time
 import urllib.error
 import urllib.parse
 import urllib.request
 import webbrowser
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+import yaml
 from aiohttp import web
-from aiohttp.web import Application, FileResponse, Request, Response
+from aiohttp.web import Application, Request, Response
 
 from nf_schema_builder.logger import log
-from nf_schema_builder.utils import handle_schema_errors
+from nf_schema_builder.schema import yaml_load
+from nf_schema_builder.utils import handle_schema_errors, json_dumps, json_loads, load_json_file, write_bytes_atomic
+
+try:
+    import uvloop
+except ImportError:  # pragma: no cover - uvloop is an optional speed-up and not available on Windows
+    uvloop = None  # type: ignore[assignment]
 
 STATIC_PATH = Path(__file__).parent.parent / "gui" / "dist"
 
-# Global server instance and thread
+# Host names that mean the schema server should be started locally
+_LOCAL_HOSTS = frozenset({"localhost", "127.0.0.1", "::1"})
+
+# Global server instance and thread, only replaced while holding the lock
 _server_instance = None
 _server_thread = None
+_server_lock = threading.RLock()
+# Set once the current server is confirmed listening, so repeated sends can skip the thread checks
+_server_alive = False
+
+# Keep-alive connections reused across requests, keyed by (scheme, host, port)
+_connections: dict[tuple[str, str, int], http.client.HTTPConnection] = {}
+
+
+async def _cache_assets(request: Request, response: web.StreamResponse) -> None:
+    """Let browsers keep the GUI assets, whose file names are content hashed by the bundler."""
+    # Runs as the response is prepared: file responses only settle on their status (e.g. 404) at that point
+    if request.path.startswith("/assets/") and response.status == 200:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+
+
+def _server_url(host: str, port: int) -> str:
+    """Build the base URL of the server, with IPv6 addresses in brackets."""
+    return f"http://[{host}]:{port}" if ":" in host else f"http://{host}:{port}"
+
+
+def _json_response(data: Any, status: int = 200) -> Response:
+    """Build a JSON response, encoded with the same serializer as the schema files."""
+    return web.Response(body=json_dumps(data), status=status, content_type="application/json")
 
 
 class SchemaServer:
@@ -49,17 +84,25 @@ class SchemaServer:
 
         # Server state
         self.app: Application = web.Application()
+        self.app.on_response_prepare.append(_cache_assets)
         self.ready: threading.Event = threading.Event()
         self.schema_saved: threading.Event = threading.Event()
         self.finished: threading.Event = threading.Event()
         self._runner: Optional[web.AppRunner] = None
+        # Loop-side counterpart of `finished`, created in start() once the server's event loop is running
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutdown: Optional[asyncio.Event] = None
+
+        # The GUI bundle doesn't change while the server runs, so the index page is read once
+        self._index_bytes = (self.static_path / "index.html").read_bytes()
+        self._index_etag = f'"{hashlib.blake2b(self._index_bytes, digest_size=8).hexdigest()}"'
 
         self._setup_routes()
 
     def _setup_routes(self) -> None:
         """Configure the application routes for the web server."""
         # Static file serving
-        self.app.router.add_static("/assets/", self.static_path / "assets")
+        self.app.router.add_static("/assets/", self.static_path / "assets", follow_symlinks=False)
         self.app.router.add_get("/", self.serve_index)
 
         # API endpoints
@@ -68,67 +111,83 @@ class SchemaServer:
         self.app.router.add_post("/api/finish", self.handle_finish)
         self.app.router.add_get("/api/health", self.health_check)
 
-    async def serve_index(self, request: Request) -> FileResponse:
+    async def serve_index(self, request: Request) -> Response:
         """Serve the main index.html file."""
-        return web.FileResponse(self.static_path / "index.html")
+        # no-cache makes the browser revalidate the index, so it always picks up the current asset names
+        headers = {"ETag": self._index_etag, "Cache-Control": "no-cache"}
+        if request.headers.get("If-None-Match") == self._index_etag:
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=self._index_bytes, content_type="text/html", headers=headers)
 
     async def get_schema(self, request: Request) -> Response:
         """Get the current schema."""
         try:
-            if self.schema_file.exists():
-                schema_data = json.loads(self.schema_file.read_text())
-                log.debug(f"Sending schema to client: {json.dumps(schema_data, indent=2)}")
-                return web.json_response({"status": "success", "type": "schema_update", "data": schema_data})
-
-            log.error(f"Schema file not found: {self.schema_file}")
-            return web.json_response(
+            # File access runs in a worker thread so it doesn't stall other requests on the event loop
+            if await asyncio.to_thread(self.schema_file.exists):
+                schema_data = await asyncio.to_thread(load_json_file, self.schema_file)
+                # Serialize once and reuse the payload for both the debug log and the response
+                payload = json_dumps({"status": "success", "type": "schema_update", "data": schema_data})
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("Sending schema to client: %s", payload.decode("utf-8"))
+                return web.Response(body=payload, content_type="application/json")
+
+            log.error("Schema file not found: %s", self.schema_file)
+            return _json_response(
                 {"status": "error", "message": f"Schema file not found: {self.schema_file}"}, status=404
             )
         except Exception as e:
-            log.error(f"Error reading schema: {e}")
-            return web.json_response({"status": "error", "message": str(e)}, status=500)
+            log.error("Error reading schema: %s", e)
+            return _json_response({"status": "error", "message": str(e)}, status=500)
 
     async def save_schema(self, request: Request) -> Response:
         """Save schema changes."""
         try:
-            schema_data = await request.json()
-            self.schema_file.write_text(json.dumps(schema_data, indent=2))
+            schema_data = json_loads(await request.read())
+            await asyncio.to_thread(write_bytes_atomic, self.schema_file, json_dumps(schema_data, indent=True))
             self.schema_saved.set()
-            log.info(f"Schema saved successfully to {self.schema_file}")
-            return web.json_response({"status": "success", "message": "Schema saved successfully"})
+            log.info("Schema saved successfully to %s", self.schema_file)
+            return _json_response({"status": "success", "message": "Schema saved successfully"})
         except Exception as e:
-            log.error(f"Error saving schema: {e}")
-            return web.json_response({"status": "error", "message": str(e)}, status=500)
+            log.error("Error saving schema: %s", e)
+            return _json_response({"status": "error", "message": str(e)}, status=500)
 
     async def handle_finish(self, request: Request) -> Response:
         """Handle the finish command."""
         try:
-            self.finished.set()
-            return web.json_response({"status": "success", "message": "Finished successfully"})
+            self.finish()
+            return _json_response({"status": "success", "message": "Finished successfully"})
         except Exception as e:
-            log.error(f"Error handling finish: {e}")
-            return web.json_response({"status": "error", "message": str(e)}, status=500)
+            log.error("Error handling finish: %s", e)
+            return _json_response({"status": "error", "message": str(e)}, status=500)
 
     async def health_check(self, request: Request) -> Response:
         """Check server health status."""
-        return web.json_response(
-            {"status": "healthy", "schema_file": str(self.schema_file), "schema_exists": self.schema_file.exists()}
+        schema_exists = await asyncio.to_thread(self.schema_file.exists)
+        return _json_response(
+            {"status": "healthy", "schema_file": str(self.schema_file), "schema_exists": schema_exists}
         )
 
     async def start(self) -> None:
         """Start the web server."""
-        self._runner = web.AppRunner(self.app)
+        self._loop = asyncio.get_running_loop()
+        self._shutdown = asyncio.Event()
+        if self.finished.is_set():
+            self._shutdown.set()
+
+        # Only the local GUI connects, so don't wait the default 60s for in-flight requests on shutdown
+        self._runner = web.AppRunner(self.app, shutdown_timeout=1.0)
         await self._runner.setup()
-        site = web.TCPSite(self._runner, self.host, self.port)
+        # A larger backlog absorbs the burst of asset requests when the GUI first loads
+        site = web.TCPSite(self._runner, self.host, self.port, backlog=512)
         await site.start()
         self.ready.set()
-        log.info(f"Server started at http://{self.host}:{self.port}")
+        log.info("Server started at %s", _server_url(self.host, self.port))
 
         try:
-            while not self.finished.is_set():
-                await asyncio.sleep(1)
+            await self._shutdown.wait()
         finally:
             await self.cleanup()
+            self._loop = None
 
     async def cleanup(self) -> None:
         """Clean up server resources."""
@@ -136,6 +195,14 @@ class SchemaServer:
             await self._runner.cleanup()
             self._runner = None
 
+    def finish(self) -> None:
+        """Signal the server to shut down. Safe to call from any thread."""
+        self.finished.set()
+        loop, shutdown = self._loop, self._shutdown
+        if loop is not None and shutdown is not None:
+            with contextlib.suppress(RuntimeError):  # the loop may already be closed
+                loop.call_soon_threadsafe(shutdown.set)
+
     def is_ready(self) -> bool:
         """Check if server is ready."""
         return self.ready.is_set()
@@ -143,43 +210,123 @@ class SchemaServer:
 
 def cleanup_server() -> None:
     """Clean up server instance and thread on exit."""
-    global _server_instance, _server_thread
-    _server_thread = None
-    _server_instance = None
+    global _server_instance, _server_thread, _server_alive
+    with _server_lock:
+        _server_alive = False
+        # Let a server that is still running shut down and release its socket instead of leaking it
+        if _server_instance is not None:
+            _server_instance.finish()
+        _server_thread = None
+        _server_instance = None
 
 
 atexit.register(cleanup_server)
 
 
-def is_port_open(host: str, port: int) -> bool:
-    """Check if a port is open on the given host."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
-        try:
-            sock.connect((host, port))
-            return True
-        except (OSError, ConnectionRefusedError):
-            return False
+def close_connections() -> None:
+    """Close all pooled HTTP connections."""
+    for conn in list(_connections.values()):
+        conn.close()
+    _connections.clear()
+
+
+atexit.register(close_connections)
+
+
+def _get_connection(scheme: str, host: str, port: int, timeout: float) -> http.client.HTTPConnection:
+    """Return the pooled connection for an origin with the given timeout, creating it if needed."""
+    key = (scheme, host, port)
+    conn = _connections.get(key)
+    if conn is None:
+        conn_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conn_class(host, port, timeout=timeout)
+        _connections[key] = conn
+    else:
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+    return conn
+
+
+def _uses_proxy(scheme: str, host: str) -> bool:
+    """Check whether urllib would route a request to this host through a proxy from the environment."""
+    return bool(urllib.request.getproxies().get(scheme)) and not urllib.request.proxy_bypass(host)
 
 
-def wait_for_server(timeout: int = 10, interval: float = 0.1) -> bool:
+def post_json(url: str, data: bytes, timeout: float = 30) -> str:
+    """
+    POST a JSON payload, over a pooled keep-alive connection for the local schema server.
+
+    Other hosts and hosts reached through a proxy go through urllib, which handles proxies and redirects.
+
+    Args:
+        url: Full target URL including scheme
+        data: Encoded JSON request body
+        timeout: Socket timeout in seconds
+
+    Returns:
+        str: Decoded response body
+
+    Raises:
+        urllib.error.HTTPError: If the server responds with an error or unhandled redirect status
+        OSError: If the connection fails
+
+    """
+    parsed = urllib.parse.urlsplit(url)
+    scheme = parsed.scheme or "http"
+    host = parsed.hostname or "localhost"
+    headers = {"Content-Type": "application/json"}
+
+    if host not in _LOCAL_HOSTS or _uses_proxy(scheme, host):
+        req = urllib.request.Request(url, data=data, headers=headers, method="POST")
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            return response.read().decode("utf-8")
+
+    port = parsed.port or (443 if scheme == "https" else 80)
+    path = parsed.path or "/"
+    if parsed.query:
+        path = f"{path}?{parsed.query}"
+
+    while True:
+        conn = _get_connection(scheme, host, port, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request("POST", path, body=data, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            break
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            _connections.pop((scheme, host, port), None)
+            # An idle pooled connection may have been dropped by the server, so retry once on a fresh one.
+            # Other errors such as timeouts aren't retried, as the server may already have handled the POST.
+            if not reused:
+                raise
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            _connections.pop((scheme, host, port), None)
+            raise
+
+    if response.status >= 300:
+        raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+    return body.decode("utf-8")
+
+
+def wait_for_server(timeout: int = 10) -> bool:
     """
     Wait for server to be ready.
 
+    Blocks on the server's ``ready`` event, which is set once the site is listening.
+
     Args:
         timeout: Maximum time to wait in seconds
-        interval: Time between checks in seconds
 
     Returns:
         bool: True if server is ready, False otherwise
 
     """
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        server = _server_instance
-        if server is not None and server.is_ready():
-            return True
-        time.sleep(interval)
-    return False
+    server = _server_instance
+    return server is not None and server.ready.wait(timeout)
 
 
 def ensure_server_running(
@@ -198,9 +345,10 @@ def ensure_server_running(
         bool: True if server is running, False otherwise
 
     """
-    global _server_instance, _server_thread
+    global _server_instance, _server_thread, _server_alive
 
-    if _server_thread is not None and _server_thread.is_alive():
+    server = _server_instance
+    if _server_alive and server is not None and not server.finished.is_set():
         return True
 
     # Parse URL for host and port
@@ -208,18 +356,11 @@ def ensure_server_running(
     host = parsed_url.hostname or "localhost"
     port = parsed_url.port or 5173
 
-    # Clear any previous state
-    cleanup_server()
-
-    def run_server() -> None:
+    def run_server(server: SchemaServer) -> None:
         """Run the server in a separate thread."""
-        loop = asyncio.new_event_loop()
+        loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
-        server = SchemaServer(host=host, port=port, schema_file=schema_file)
-        global _server_instance
-        _server_instance = server
-
         try:
             loop.run_until_complete(server.start())
         except KeyboardInterrupt:
@@ -227,18 +368,32 @@ def ensure_server_running(
         finally:
             loop.close()
 
-    # Start new server thread
-    _server_thread = threading.Thread(target=run_server, daemon=True)
-    _server_thread.start()
+    # Check and replace the globals in one step, so concurrent callers can't start two servers
+    with _server_lock:
+        if _server_thread is not None and _server_thread.is_alive():
+            return True
+
+        # Clear any previous state
+        cleanup_server()
+
+        # Create the server up front so its ready event can be waited on before the thread gets scheduled
+        server = SchemaServer(host=host, port=port, schema_file=schema_file)
+        _server_instance = server
+
+        # Start new server thread
+        _server_thread = threading.Thread(target=run_server, args=(server,), daemon=True)
+        _server_thread.start()
 
     # Wait for server to be ready
     if wait_for_server(timeout):
-        log.debug(f"Started schema server at {host}:{port} with schema file {schema_file}")
+        _server_alive = True
+        log.debug("Started schema server at %s:%s with schema file %s", host, port, schema_file)
         if not no_browser:
-            webbrowser.open(f"http://{host}:{port}")
+            # Launching the browser can take a while; don't hold up sending the schema for it
+            threading.Thread(target=webbrowser.open, args=(_server_url(host, port),), daemon=True).start()
         return True
 
-    log.error(f"Server failed to start at {host}:{port} within {timeout} seconds")
+    log.error("Server failed to start at %s:%s within %s seconds", host, port, timeout)
     cleanup_server()
     return False
 
@@ -260,14 +415,31 @@ def wait_for_finish(base_url: str) -> bool:
         return False
 
     # Wait indefinitely for the finished event to be set
-    while not server.finished.is_set():
-        time.sleep(1)
-
+    server.finished.wait()
     return True
 
 
+def _normalize_url(url: str) -> tuple[str, bool]:
+    """
+    Normalize a target URL to the schema API endpoint.
+
+    Args:
+        url: URL as given by the user, with or without scheme and endpoint
+
+    Returns:
+        tuple[str, bool]: The full schema endpoint URL and whether it points at the local server
+
+    """
+    if not url.startswith(("http://", "https://")):
+        url = f"http://{url}"
+    if not url.endswith("/api/schema"):
+        url = f"{url.rstrip('/')}/api/schema"
+    # Compare the parsed host name, so that e.g. localhost.example.com doesn't count as local
+    return url, urllib.parse.urlsplit(url).hostname in _LOCAL_HOSTS
+
+
 @handle_schema_errors
-def send_schema(schema_file: Path, url: str, no_browser: bool = False) -> Optional[str]:
+def send_schema(schema_file: Path, url: str, no_browser: bool = False, schema: Optional[dict] = None) -> Optional[str]:
     """
     Send schema file to URL using HTTP.
 
@@ -275,60 +447,59 @@ def send_schema(schema_file: Path, url: str, no_browser: bool = False) -> Option
         schema_file: Path to schema file
         url: Target URL
         no_browser: Whether to open browser
+        schema: Already loaded schema, skips reading and parsing the file again
 
     Returns:
         Optional[str]: Response data if successful, None otherwise
 
     """
+    url, is_local = _normalize_url(url)
+
     # Ensure server is running if sending to localhost
-    if "localhost" in url or "127.0.0.1" in url:
+    if is_local:
         if not ensure_server_running(url, schema_file=schema_file, timeout=10, no_browser=no_browser):
             return None
 
-    try:
-        # Load schema file
-        with open(schema_file, encoding="utf-8") as f:
-            schema = json.load(f)
-    except json.JSONDecodeError as e:
-        log.error(f"Failed to parse schema file: {e}")
-        return None
-
-    # Prepare request
-    try:
-        data = json.dumps(schema).encode("utf-8")
-    except (TypeError, ValueError) as e:
-        log.error(f"Failed to serialize schema: {e}")
-        return None
-
-    headers = {"Content-Type": "application/json"}
+    is_yaml = schema_file.suffix.lower() in (".yml", ".yaml")
+    raw: Optional[bytes] = None
+    if schema is None:
+        try:
+            # Load schema file
+            raw = schema_file.read_bytes()
+            schema = yaml_load(raw) if is_yaml else json_loads(raw)
+        except (json.JSONDecodeError, yaml.YAMLError) as e:
+            log.error("Failed to parse schema file: %s", e)
+            return None
 
-    # Ensure URL has protocol and correct endpoint
-    if not url.startswith(("http://", "https://")):
-        url = f"http://{url}"
-    if not url.endswith("/api/schema"):
-        url = f"{url.rstrip('/')}/api/schema"
+    # Prepare request: a JSON file that was just read is already a valid request body
+    if raw is not None and not is_yaml:
+        data = raw
+    else:
+        try:
+            data = json_dumps(schema)
+        except (TypeError, ValueError) as e:
+            log.error("Failed to serialize schema: %s", e)
+            return None
 
     # Send request
-    req = urllib.request.Request(url, data=data, headers=headers, method="POST")
-    log.debug(f"Sending schema to {url}")
+    log.debug("Sending schema to %s", url)
 
     try:
-        with urllib.request.urlopen(req, timeout=30) as response:  # Keep reasonable timeout for HTTP request
-            response_data: str = response.read().decode("utf-8")
-            log.info(f"✅ Schema sent successfully to {url}")
-            log.debug(f"Response: {response_data}")
-
-            # For localhost, wait for finish signal
-            if "localhost" in url or "127.0.0.1" in url:
-                log.info("Waiting for you to finish editing. Click the 'Finish' button when done...")
-                if not wait_for_finish(url):
-                    log.error("Failed to receive finish signal")
-                    return None
-
-            return response_data
-    except urllib.error.URLError as e:
-        log.error(f"Failed to connect to {url}: {e}")
+        response_data = post_json(url, data, timeout=30)  # Keep reasonable timeout for HTTP request
+        log.info("✅ Schema sent successfully to %s", url)
+        log.debug("Response: %s", response_data)
+
+        # For localhost, wait for finish signal
+        if is_local:
+            log.info("Waiting for you to finish editing. Click the 'Finish' button when done...")
+            if not wait_for_finish(url):
+                log.error("Failed to receive finish signal")
+                return None
+
+        return response_data
+    except OSError as e:
+        log.error("Failed to connect to %s: %s", url, e)
         return None
     except Exception as e:
-        log.error(f"Unexpected error: {e}")
+        log.error("Unexpected error: %s", e)
         return None
@@ -1,15 +1,30 @@
 """Schema validation functions for nf-schema-builder."""
 
 import json
+import math
+from collections import defaultdict
+from collections.abc import Mapping
 from pathlib import Path
-from typing import Any, Optional, cast
+from typing import IO, Any, Optional, Union, cast
 
 import typer
 import yaml
-from jsonschema import validate
-from jsonschema.exceptions import ValidationError
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import ValidationError, best_match
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 
-from nf_schema_builder.utils import handle_schema_errors
+from nf_schema_builder.utils import handle_schema_errors, load_json_file
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader  # type: ignore[assignment]
+
+
+def yaml_load(stream: Union[bytes, str, IO[Any]]) -> Any:
+    """Parse YAML safely, using the libyaml based loader when PyYAML was built with it."""
+    return yaml.load(stream, Loader=SafeLoader)
 
 
 @handle_schema_errors
@@ -17,11 +32,9 @@ def load_schema(file_path: Path) -> dict:
     """Load schema from JSON or YAML file."""
     try:
         if file_path.suffix.lower() in (".yml", ".yaml"):
-            with file_path.open() as f:
-                result = yaml.safe_load(f)
+            result = yaml_load(file_path.read_bytes())
         else:
-            with file_path.open() as f:
-                result = json.load(f)
+            result = load_json_file(file_path)
 
         if not isinstance(result, dict):
             raise typer.BadParameter("Schema must be a dictionary")
@@ -33,17 +46,45 @@ def load_schema(file_path: Path) -> dict:
 class SchemaValidator:
     """Handles schema validation operations."""
 
-    def __init__(self, schema: dict, defs_key: str = "$defs"):
+    __slots__ = ("schema", "defs_key", "validator", "_param_index", "_owns_properties")
+
+    def __init__(self, schema: dict, defs_key: str = "$defs", validator: Optional[Validator] = None):
         """
         Initialize SchemaValidator with schema and definitions key.
 
         Args:
             schema: The JSON schema dictionary
             defs_key: The key used for definitions in the schema (defaults to "$defs")
+            validator: Already compiled validator for the schema, built from the schema if omitted
 
         """
         self.schema = schema
         self.defs_key = defs_key
+        self.validator = validator or validator_for(schema, default=Draft202012Validator)(schema)
+        self._param_index = self._build_param_index()
+        # The schema belongs to the caller, add_parameter copies it before the first change
+        self._owns_properties = False
+
+    def _build_param_index(self) -> dict[str, dict[str, Any]]:
+        """Map every parameter name to its definition, resolving the allOf references once."""
+        index: dict[str, dict[str, Any]] = {}
+
+        # Top-level properties take precedence over definitions
+        for name, definition in self.schema.get("properties", {}).items():
+            if isinstance(definition, dict):
+                index[name] = definition
+
+        # Definitions referenced in allOf, the first section defining a parameter wins
+        defs = self.schema.get(self.defs_key, {})
+        for section in self.schema.get("allOf", []):
+            if "$ref" in section:
+                def_name = section["$ref"].split("/")[-1]
+                if def_name in defs and isinstance(defs[def_name], dict):
+                    for name, definition in defs[def_name].get("properties", {}).items():
+                        if isinstance(definition, dict):
+                            index.setdefault(name, definition)
+
+        return index
 
     def validate_parameter(self, param_name: str, param_value: Any) -> tuple[bool, str]:
         """Validate a parameter against its schema definition."""
@@ -54,47 +95,70 @@ class SchemaValidator:
         if schema_param.get("hidden", False) or param_value == "null":
             return True, ""
 
-        # Create a mini-schema for this parameter
+        # Validate using jsonschema, reusing the compiled validator instead of re-checking the meta-schema
         param_schema = {"type": "object", "properties": {param_name: schema_param}}
-
-        try:
-            # Validate using jsonschema
-            validate({param_name: param_value}, param_schema)
+        error = best_match(self.validator.evolve(schema=param_schema).iter_errors({param_name: param_value}))
+        if error is None:
             return True, ""
-        except ValidationError as e:
-            return False, str(e.message)
+        return False, str(error.message)
 
-    def find_parameter(self, param_name: str) -> Optional[dict[str, Any]]:
-        """Find parameter definition in schema."""
-        # Check top-level properties
-        properties = self.schema.get("properties", {})
-        if param_name in properties and isinstance(properties[param_name], dict):
-            return cast(dict[str, Any], properties[param_name].copy())
+    def validate_parameters(self, params: Mapping[str, Any]) -> dict[str, str]:
+        """
+        Validate several parameters against their schema definitions in a single pass.
 
-        # Check definitions referenced in allOf
-        for section in self.schema.get("allOf", []):
-            if "$ref" in section:
-                def_name = section["$ref"].split("/")[-1]
-                defs = self.schema.get(self.defs_key, {})
-                if def_name in defs and isinstance(defs[def_name], dict):
-                    definition = defs[def_name]
-                    def_properties = definition.get("properties", {})
-                    if param_name in def_properties and isinstance(def_properties[param_name], dict):
-                        return cast(dict[str, Any], def_properties[param_name].copy())
+        Args:
+            params: Parameter values keyed by parameter name
 
-        return None
+        Returns:
+            dict[str, str]: Error message for each invalid parameter, in the order of params
+
+        """
+        properties: dict[str, dict[str, Any]] = {}
+        instance: dict[str, Any] = {}
+        not_found = set()
+        for param_name, param_value in params.items():
+            schema_param = self.find_parameter(param_name)
+            if not schema_param:
+                not_found.add(param_name)
+            elif not (schema_param.get("hidden", False) or param_value == "null"):
+                properties[param_name] = schema_param
+                instance[param_name] = param_value
+
+        # Validate all values against one object schema and group the errors by parameter
+        errors: dict[str, list[ValidationError]] = defaultdict(list)
+        for error in self.validator.evolve(schema={"type": "object", "properties": properties}).iter_errors(instance):
+            errors[str(error.path[0])].append(error)
+
+        invalid_params = {}
+        for param_name in params:
+            if param_name in not_found:
+                invalid_params[param_name] = "Parameter not found in schema"
+            elif param_name in errors:
+                invalid_params[param_name] = str(cast(ValidationError, best_match(errors[param_name])).message)
+        return invalid_params
+
+    def find_parameter(self, param_name: str) -> Optional[dict[str, Any]]:
+        """Find parameter definition in schema. The returned definition is shared with the schema, don't modify it."""
+        return self._param_index.get(param_name)
 
     def add_parameter(self, param_name: str, param_value: str) -> None:
         """Add a new parameter to the schema."""
         # Infer parameter type
         param_type = "string"  # default type
-        try:
-            if str(param_value).lower() in ["true", "false"]:
-                param_type = "boolean"
-            elif str(param_value).replace(".", "").isdigit():
-                param_type = "number" if "." in str(param_value) else "integer"
-        except (ValueError, AttributeError):
-            pass
+        value = str(param_value)
+        if value.lower() in ("true", "false"):
+            param_type = "boolean"
+        else:
+            try:
+                int(value)
+                param_type = "integer"
+            except ValueError:
+                try:
+                    # float() also accepts "nan" and "inf", which are more likely meant as strings
+                    if math.isfinite(float(value)):
+                        param_type = "number"
+                except ValueError:
+                    pass
 
         # Create parameter definition
         param_def = {
@@ -102,7 +166,9 @@ class SchemaValidator:
             "description": f"Parameter {param_name}",
         }
 
-        # Add to top-level properties
-        if "properties" not in self.schema:
-            self.schema["properties"] = {}
+        # Add to top-level properties, of a copy so the caller's schema stays as loaded
+        if not self._owns_properties:
+            self.schema = {**self.schema, "properties": dict(self.schema.get("properties", {}))}
+            self._owns_properties = True
         self.schema["properties"][param_name] = param_def
+        self._param_index[param_name] = param_def
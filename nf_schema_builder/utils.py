@@ -2,22 +2,95 @@
 
 import hashlib
 import json
+import mmap
+import os
 import re
+import shutil
+import threading
 from dataclasses import dataclass
-from functools import wraps
+from functools import cache, wraps
 from pathlib import Path
-from subprocess import run
-from typing import Callable, Optional, TypeVar
+from subprocess import DEVNULL, PIPE, Popen
+from typing import IO, Any, Callable, Optional, TypeVar, Union, cast
 
 import typer
-from jsonschema.exceptions import SchemaError, ValidationError
 
 from nf_schema_builder.logger import log
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speed-up
+    orjson = None  # type: ignore[assignment]
+
 # Type definitions
 T = TypeVar("T")
 ConfigDict = dict[str, str]
 
+# Files at least this large are memory-mapped for parsing, below it a plain read is faster
+MMAP_THRESHOLD = 1 << 20
+
+# Read size when hashing workflow files for the config cache key
+HASH_CHUNK_SIZE = 1 << 20
+
+# A "key = value" line of `nextflow config -flat` output
+_CONFIG_LINE_RE = re.compile(r"\s*([^=\s]+)\s*=\s*(.*?)\s*")
+
+# Parameter assignments such as "params.foo = ..." at the start of a main.nf line (but not "==" comparisons)
+_PARAMS_RE = re.compile(r"^[ \t]*(params\.[a-zA-Z0-9_]+)[ \t]*=(?!=)", re.MULTILINE)
+
+# Workflow configs already fetched in this process, keyed by resolved workflow path
+_wf_config_memo: dict[Path, ConfigDict] = {}
+
+
+def json_dumps(data: Any, indent: bool = False) -> bytes:
+    """Serialize data to UTF-8 encoded JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else None)
+    # Match orjson's output byte for byte, so saved schemas don't depend on which backend is installed
+    if indent:
+        return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def json_loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON from bytes or str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def load_json_file(path: Path) -> Any:
+    """Parse a JSON file, memory-mapping large files so orjson reads them straight from the page cache."""
+    if orjson is None or path.stat().st_size < MMAP_THRESHOLD:
+        return json_loads(path.read_bytes())
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+        return orjson.loads(view)
+
+
+def schema_hash(schema: dict, draft: str) -> Optional[str]:
+    """Hash the contents of a schema together with the draft it is validated against, None if it isn't JSON."""
+    try:
+        content = json_dumps(schema)
+    except (TypeError, ValueError):  # e.g. YAML dates, which can't be hashed as JSON
+        return None
+    return hashlib.sha256(draft.encode("utf-8") + content).hexdigest()[:25]
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """Write a file through a temporary file and rename, so readers never observe a partially written file."""
+    # Replace the target of a symlink rather than the link itself
+    path = path.resolve()
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
 
 def handle_schema_errors(func: Callable[..., T]) -> Callable[..., T]:
     """Standardize error handling for schema operations with this decorator."""
@@ -26,14 +99,16 @@ def handle_schema_errors(func: Callable[..., T]) -> Callable[..., T]:
     def wrapper(*args: object, **kwargs: object) -> T:
         try:
             return func(*args, **kwargs)
-        except SchemaError as e:
-            log.error(f"❌ Invalid schema: {e}")
-            raise typer.Exit(1) from e
-        except ValidationError as e:
-            log.error(f"❌ Invalid parameters: {e}")
-            raise typer.Exit(1) from e
         except Exception as e:
-            log.error(f"❌ Error: {e}")
+            # Imported lazily: jsonschema is only needed once something has actually gone wrong
+            from jsonschema.exceptions import SchemaError, ValidationError
+
+            if isinstance(e, SchemaError):
+                log.error(f"❌ Invalid schema: {e}")
+            elif isinstance(e, ValidationError):
+                log.error(f"❌ Invalid parameters: {e}")
+            else:
+                log.error(f"❌ Error: {e}")
             raise typer.Exit(1) from e
 
     return wrapper
@@ -61,36 +136,56 @@ class CacheManager:
         cache_file = self.cache_dir / f"{cache_key}.json"
         self._save_cache(cache_file, config)
 
+    def is_schema_checked(self, schema: dict, draft: str) -> bool:
+        """Check whether this exact schema already passed the meta-schema check for a draft."""
+        marker = self._schema_marker(schema, draft)
+        return marker is not None and marker.exists()
+
+    def mark_schema_checked(self, schema: dict, draft: str) -> None:
+        """Remember that a schema passed the meta-schema check for a draft."""
+        marker = self._schema_marker(schema, draft)
+        if marker is None:
+            return
+        try:
+            marker.touch()
+        except OSError as e:
+            log.debug(f"Failed to save schema check marker: {e}")
+
+    def _schema_marker(self, schema: dict, draft: str) -> Optional[Path]:
+        """Get the marker file for a schema and draft, keyed by a hash of the serialized schema."""
+        key = schema_hash(schema, draft)
+        return self.cache_dir / f"schema-{key}.ok" if key is not None else None
+
     def _compute_cache_key(self, wf_path: Path) -> str:
         """Compute cache key from workflow files."""
-        content_hash = ""
+        content_hash = hashlib.sha256()
         for fn in ["nextflow.config", "main.nf"]:
             try:
                 with open(wf_path / fn, "rb") as fh:
-                    content_hash += hashlib.sha256(fh.read()).hexdigest()
+                    # Name and size mark where each file starts, the contents are hashed in chunks
+                    content_hash.update(f"{fn}:{os.fstat(fh.fileno()).st_size}\n".encode())
+                    for chunk in iter(lambda: fh.read(HASH_CHUNK_SIZE), b""):
+                        content_hash.update(chunk)
             except FileNotFoundError:
                 continue
-        return hashlib.sha256(content_hash.encode("utf-8")).hexdigest()[:25]
+        return content_hash.hexdigest()[:25]
 
     def _load_cache(self, cache_file: Path) -> Optional[ConfigDict]:
         """Load configuration from cache file."""
         try:
-            with open(cache_file) as f:
-                data = json.load(f)
-                if isinstance(data, dict) and all(
-                    isinstance(k, str) and (isinstance(v, str) or v is None) for k, v in data.items()
-                ):
-                    return data
-                return None
-        except (json.JSONDecodeError, OSError) as e:
+            data = json_loads(cache_file.read_bytes())
+            # JSON object keys are always strings, only the values need checking
+            if isinstance(data, dict) and all(isinstance(v, str) or v is None for v in data.values()):
+                return data
+            return None
+        except (ValueError, OSError) as e:  # JSONDecodeError and UnicodeDecodeError are ValueErrors
             log.debug(f"Failed to load cache: {e}")
             return None
 
     def _save_cache(self, cache_file: Path, config: ConfigDict) -> None:
         """Save configuration to cache file."""
         try:
-            with open(cache_file, "w") as f:
-                json.dump(config, f, indent=4)
+            write_bytes_atomic(cache_file, json_dumps(config))
         except OSError as e:
             log.debug(f"Failed to save cache: {e}")
 
@@ -101,36 +196,33 @@ class ConfigParser:
     @staticmethod
     def parse_config_line(line: str) -> tuple[Optional[str], Optional[str]]:
         """Parse a single configuration line."""
-        try:
-            key, value = line.split(" = ", 1)
-            return key, value.strip("'\"")
-        except ValueError:
+        match = _CONFIG_LINE_RE.fullmatch(line)
+        if match is None:
             return None, None
+        key, value = match.groups()
+        # Remove one pair of matching quotes around the value
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+            value = value[1:-1]
+        return key, value
 
     @staticmethod
     def parse_main_nf(content: str) -> ConfigDict:
         """Parse main.nf file for parameter declarations."""
-        params = {}
-        for line in content.splitlines():
-            match = re.match(r"^\s*(params\.[a-zA-Z0-9_]+)\s*=(?!=)", line)
-            if match:
-                params[match.group(1)] = "null"
-        return params
+        return {match.group(1): "null" for match in _PARAMS_RE.finditer(content)}
 
 
+@cache
 def check_nextflow_installation() -> bool:
     """
     Check if Nextflow is installed and accessible.
 
+    Looks the executable up on PATH instead of launching it, and remembers the answer for the rest of the process.
+
     Returns:
         bool: True if Nextflow is installed, False otherwise
 
     """
-    try:
-        result = run("nextflow", capture_output=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
+    return shutil.which("nextflow") is not None
 
 
 @handle_schema_errors
@@ -146,6 +238,9 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> ConfigDict:
         Dictionary of workflow configuration settings
 
     """
+    if cache_config and wf_path.resolve() in _wf_config_memo:
+        return dict(_wf_config_memo[wf_path.resolve()])
+
     if not check_nextflow_installation():
         log.error("Nextflow is not installed")
         raise typer.Exit(1) from None
@@ -159,6 +254,7 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> ConfigDict:
     if cache_config:
         cached_config = cache_manager.get_cached_config(wf_path)
         if cached_config:
+            _wf_config_memo[wf_path.resolve()] = dict(cached_config)
             return cached_config
 
     # Parse configuration
@@ -166,13 +262,17 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> ConfigDict:
 
     # Parse nextflow config
     try:
-        result = run(["nextflow", "config", "-flat", str(wf_path)], capture_output=True)
-        if result.returncode == 0:
-            nfconfig_raw = result.stdout.decode("utf-8")
-            for line in nfconfig_raw.splitlines():
-                key, value = config_parser.parse_config_line(line)
+        # Parse the output line by line as Nextflow writes it, instead of collecting it all first
+        nf_config: ConfigDict = {}
+        with Popen(
+            ["nextflow", "config", "-flat", str(wf_path)], stdout=PIPE, stderr=DEVNULL, encoding="utf-8"
+        ) as proc:
+            for line in cast(IO[str], proc.stdout):
+                key, value = config_parser.parse_config_line(line.rstrip("\n"))
                 if key and value:
-                    config[key] = value
+                    nf_config[key] = value
+        if proc.returncode == 0:
+            config.update(nf_config)
     except Exception as e:
         log.error(f"Error running nextflow config command: {e}")
         raise typer.Exit(1) from e
@@ -189,5 +289,6 @@ def fetch_wf_config(wf_path: Path, cache_config: bool = True) -> ConfigDict:
     # Cache the results if needed
     if cache_config and config:
         cache_manager.save_config(wf_path, config)
+        _wf_config_memo[wf_path.resolve()] = dict(config)
 
     return config
@@ -1,8 +1,11 @@
 """Validation module for nf-schema-builder."""
 
-from typing import Optional, Union
+from collections import OrderedDict
+from typing import Callable, Optional, Union
 
 from jsonschema import Draft7Validator, Draft202012Validator
+from jsonschema.protocols import Validator
+from jsonschema.validators import validator_for
 from rich.panel import Panel
 from rich.progress import BarColumn, Progress, TextColumn
 from rich.prompt import Confirm
@@ -11,41 +14,103 @@ from rich.table import Table
 from nf_schema_builder.config import ValidationConfig
 from nf_schema_builder.logger import console, log
 from nf_schema_builder.schema import SchemaValidator
-from nf_schema_builder.utils import handle_schema_errors
+from nf_schema_builder.utils import CacheManager, handle_schema_errors, schema_hash
+
+# Supported JSON schema drafts, keyed by their $schema URI
+_DRAFTS: dict[str, type[Validator]] = {
+    "https://json-schema.org/draft/2020-12/schema": Draft202012Validator,
+    "http://json-schema.org/draft-07/schema": Draft7Validator,
+}
+
+# Content hashes of the schemas checked in this process, least recently used first
+_checked_schemas: OrderedDict[str, None] = OrderedDict()
+_CHECKED_SCHEMAS_SIZE = 32
+
+
+def get_validator(schema: dict) -> Validator:
+    """
+    Get a validator for a schema, checking it against its meta-schema only on first use.
+
+    A schema that passed the check is remembered in the cache directory, so unchanged schemas skip it on later runs.
+
+    Args:
+        schema: The JSON schema dictionary
+
+    Returns:
+        Validator: Validator instance for the draft declared in the schema
+
+    """
+    validator_cls = _DRAFTS.get(schema.get("$schema", "")) or validator_for(schema, default=Draft202012Validator)
+    key = schema_hash(schema, validator_cls.__name__)
+    if key is not None and key in _checked_schemas:
+        _checked_schemas.move_to_end(key)
+        return validator_cls(schema)
+
+    # The marker cache is best-effort, e.g. the home directory may not be writable
+    try:
+        cache_manager: Optional[CacheManager] = CacheManager()
+        checked = cache_manager.is_schema_checked(schema, validator_cls.__name__)
+    except OSError as e:
+        log.debug("Schema check cache unavailable: %s", e)
+        cache_manager, checked = None, False
+    if not checked:
+        validator_cls.check_schema(schema)
+        if cache_manager is not None:
+            cache_manager.mark_schema_checked(schema, validator_cls.__name__)
+    if key is not None:
+        _checked_schemas[key] = None
+        if len(_checked_schemas) > _CHECKED_SCHEMAS_SIZE:
+            _checked_schemas.popitem(last=False)
+    # Building the validator is cheap, it's the meta-schema check that is worth skipping
+    return validator_cls(schema)
+
+
+def _to_bool(value: str) -> Union[bool, str]:
+    """Convert string boolean to actual boolean."""
+    return value.lower() == "true"
+
+
+def _to_int(value: str) -> Union[int, str]:
+    """Convert string integer to actual integer, keeping the string if it isn't one."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def _to_float(value: str) -> Union[float, str]:
+    """Convert string number to actual float, keeping the string if it isn't one."""
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+# Converters for the schema types that need one, every other type keeps the string value
+_CONVERTERS: dict[str, Callable[[str], Union[bool, int, float, str]]] = {
+    "boolean": _to_bool,
+    "integer": _to_int,
+    "number": _to_float,
+}
 
 
 def convert_param_value(value: str, param_type: str) -> Union[bool, int, float, str]:
     """Convert parameter value to the correct type based on schema."""
-    if param_type == "boolean":
-        # Convert string boolean to actual boolean
-        return value.lower() == "true"
-    elif param_type == "integer":
-        # Convert string integer to actual integer
-        try:
-            return int(value)
-        except ValueError:
-            return value
-    elif param_type == "number":
-        # Convert string number to actual float
-        try:
-            return float(value)
-        except ValueError:
-            return value
-    return value
+    # The schema type may also be a list such as ["string", "null"], which is left unconverted as before
+    converter = _CONVERTERS.get(param_type) if isinstance(param_type, str) else None
+    return converter(value) if converter is not None else value
 
 
 @handle_schema_errors
 def validate_json_schema(schema: dict) -> None:
     """Validate schema against JSON Schema specifications."""
     schema_version = schema.get("$schema", "")
-    if schema_version == "https://json-schema.org/draft/2020-12/schema":
-        Draft202012Validator.check_schema(schema)
-    elif schema_version == "http://json-schema.org/draft-07/schema":
-        Draft7Validator.check_schema(schema)
-    else:
+    if schema_version not in _DRAFTS:
         log.error(f"❌ Unsupported schema version: {schema_version}")
         raise ValueError("Unsupported schema version")
 
+    get_validator(schema)
+
     log.info("✅ Valid JSON schema!")
 
 
@@ -60,53 +125,65 @@ def validate_workflow_parameters(schema: dict, config: ValidationConfig) -> Opti
 
         workflow_params = config.workflow_config.get_params()
         progress.update(task, advance=20, description="Initializing validator...")
-        validator = SchemaValidator(schema, config.defs_notation)
+        validator = SchemaValidator(schema, config.defs_notation, get_validator(schema))
 
         # Filter and prepare parameters for validation
         progress.update(task, advance=20, description="Preparing parameters...")
+        # Ignored parameters also cover their nested keys, e.g. "foo" ignores "foo.bar"
+        ignored_prefixes = tuple(f"{ignored}." for ignored in config.ignored_params)
         params_to_validate = [
-            (key.removeprefix("params."), value)
-            for key, value in workflow_params.items()
-            if not any(
-                key.removeprefix("params.") == ignored or key.removeprefix("params.").startswith(f"{ignored}.")
-                for ignored in config.ignored_params
-            )
+            (param_name, value)
+            for param_name, value in ((key.removeprefix("params."), value) for key, value in workflow_params.items())
+            if param_name not in config.ignored_params and not param_name.startswith(ignored_prefixes)
         ]
 
-        invalid_params = {}
-
         # Reset task for parameter validation
         progress.update(task, total=len(params_to_validate), completed=0, description="Validating parameters...")
 
+        # Convert the values of parameters defined in the schema to their type, the rest need user input
+        known_params = {}
+        unknown_params = []
         for param_name, value in params_to_validate:
-            progress.advance(task)
-            progress.update(task, description=f"Validating {param_name}")
-
-            # Get parameter schema to determine type
             param_schema = validator.find_parameter(param_name)
-            if param_schema:
-                param_type = param_schema.get("type", "string")
-                # Convert value to correct type before validation
-                converted_value = convert_param_value(value, param_type)
-                is_valid, error_msg = validator.validate_parameter(param_name, converted_value)
+            if not param_schema:
+                unknown_params.append((param_name, value))
+            elif not param_schema.get("hidden", False):  # hidden parameters are always valid
+                known_params[param_name] = convert_param_value(value, param_schema.get("type", "string"))
+
+        # Validate all known parameters in a single pass
+        invalid_params = validator.validate_parameters(known_params)
+        progress.advance(task, len(params_to_validate) - len(unknown_params))
+        for param_name, value in known_params.items():
+            log.debug(
+                "Validating '%s' with default value '%s': %s %s",
+                param_name,
+                value,
+                param_name not in invalid_params,
+                invalid_params.get(param_name, ""),
+            )
+
+        for param_name, value in unknown_params:
+            progress.update(task, advance=1, description=f"Validating {param_name}")
+
+            should_add = Confirm.ask(
+                f"[yellow]Parameter '{param_name}' not found in schema. Would you like to add it?[/]",
+                default=True,
+            )
+            if should_add:
+                validator.add_parameter(param_name, value)
+                log.info(f"Adding '{param_name}' to schema...")
+                is_valid = True
+                error_msg = ""
             else:
-                should_add = Confirm.ask(
-                    f"[yellow]Parameter '{param_name}' not found in schema. Would you like to add it?[/]",
-                    default=True,
-                )
-                if should_add:
-                    validator.add_parameter(param_name, value)
-                    log.info(f"Adding '{param_name}' to schema...")
-                    is_valid = True
-                    error_msg = ""
-                else:
-                    is_valid = False
-                    error_msg = "Parameter not defined in schema"
-
-            log.debug(f"Validating '{param_name}' with default value '{value}': {is_valid} {error_msg}")
+                is_valid = False
+                error_msg = "Parameter not defined in schema"
+
+            log.debug("Validating '%s' with default value '%s': %s %s", param_name, value, is_valid, error_msg)
             if not is_valid:
                 invalid_params[param_name] = error_msg
 
+        # Report the errors in the order of the workflow config, as when parameters were validated one by one
+        invalid_params = {name: invalid_params[name] for name, _ in params_to_validate if name in invalid_params}
         progress.update(task, description=f"Validated {len(params_to_validate)} parameters")
 
     if invalid_params:
@@ -1,7 +1,33 @@
 """Shared pytest fixtures."""
 
+import shutil
+from functools import partial
+from pathlib import Path
+
 import pytest
 
+from nf_schema_builder.utils import CacheManager
+
+TESTS_DIR = Path(__file__).parent
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Point the cache used by the config fetch and schema checks at tmp_path instead of the home directory."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("nf_schema_builder.utils.CacheManager", partial(CacheManager, cache_dir=cache_dir))
+    monkeypatch.setattr("nf_schema_builder.validation.CacheManager", partial(CacheManager, cache_dir=cache_dir))
+    return cache_dir
+
+
+@pytest.fixture(scope="session")
+def _schema_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create a pipeline directory with the test schema and main.nf once per test session."""
+    template_dir = tmp_path_factory.mktemp("schema_tpl")
+    shutil.copy(TESTS_DIR / "test-schema.json", template_dir / "nextflow_schema.json")
+    shutil.copy(TESTS_DIR / "main.nf", template_dir / "main.nf")
+    return template_dir
+
 
 @pytest.fixture
 def workspace_dir(tmp_path):
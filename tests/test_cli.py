@@ -1,24 +1,24 @@
 """Tests for cli.py module."""
 
+import contextlib
+import json
 import shutil
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
+import typer
 from typer.testing import CliRunner
 
-from nf_schema_builder.cli import app
+from nf_schema_builder.cli import app, handle_cli_error, perform_validation, validate
 
 runner = CliRunner(mix_stderr=False)
 
 
 @pytest.fixture
-def schema_file(tmp_path: Path) -> Path:
-    """Copy schema file for testing from tests/test-schema.json to tmp_path."""
-    shutil.copy("tests/test-schema.json", tmp_path / "nextflow_schema.json")
-    shutil.copy("tests/main.nf", tmp_path / "main.nf")
-
-    return Path(tmp_path / "nextflow_schema.json")
+def schema_file(_schema_template: Path, tmp_path: Path) -> Path:
+    """Copy the pipeline template with tests/test-schema.json and tests/main.nf to tmp_path."""
+    shutil.copytree(_schema_template, tmp_path, dirs_exist_ok=True)
+    return tmp_path / "nextflow_schema.json"
 
 
 # def test_send_command_success(schema_file: Path) -> None:
@@ -47,49 +47,73 @@ def schema_file(tmp_path: Path) -> Path:
 #     assert result.exit_code == 1
 
 
-def test_validate_command_success(schema_file: Path, caplog: pytest.LogCaptureFixture) -> None:
+def test_validate_command_success(
+    schema_file: Path, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test successful schema validation."""
     mock_config = {"plugins": "nf-schema", "params.test_param": "value"}
 
-    with (
-        patch("nf_schema_builder.utils.check_nextflow_installation", return_value=True),
-        patch("nf_schema_builder.utils.fetch_wf_config", return_value=mock_config),
-    ):
-        result = runner.invoke(app, ["validate", str(schema_file)], catch_exceptions=False)
-        assert result.exit_code == 0
-        assert "All parameters are valid!" in caplog.text
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: True)
+    monkeypatch.setattr("nf_schema_builder.config.fetch_wf_config", lambda *args, **kwargs: mock_config)
+    result = runner.invoke(app, ["validate", str(schema_file)], catch_exceptions=False)
+    assert result.exit_code == 0
+    assert "All parameters are valid!" in caplog.text
 
 
-def test_validate_command_no_nextflow(schema_file: Path, caplog: pytest.LogCaptureFixture) -> None:
+def test_validate_command_no_nextflow(
+    schema_file: Path, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test validate command without Nextflow installed."""
-    with patch("nf_schema_builder.utils.check_nextflow_installation", return_value=False):
-        result = runner.invoke(app, ["validate", str(schema_file)], catch_exceptions=False)
-        assert result.exit_code == 1
-        assert "Nextflow is not installed" in caplog.text
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: False)
+    with pytest.raises(typer.Exit) as exc_info:
+        validate(schema_file)
+    assert exc_info.value.exit_code == 1
+    assert "Nextflow is not installed" in caplog.text
 
 
-def test_validate_command_invalid_params(schema_file: Path, caplog: pytest.LogCaptureFixture) -> None:
+def test_validate_command_invalid_params(
+    schema_file: Path, caplog: pytest.LogCaptureFixture, monkeypatch: pytest.MonkeyPatch
+) -> None:
     """Test validate command with invalid parameters."""
     mock_config = {
         "plugins": "nf-schema",
         "params.test_param": 42,  # Should be string according to schema
     }
 
-    with (
-        patch("nf_schema_builder.utils.check_nextflow_installation", return_value=True),
-        patch("nf_schema_builder.utils.fetch_wf_config", return_value=mock_config),
-    ):
-        result = runner.invoke(app, ["validate", str(schema_file)], catch_exceptions=False)
-        assert result.exit_code == 1  # Should fail due to invalid params
-        assert "Schema validation failed" in caplog.text
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: True)
+    monkeypatch.setattr("nf_schema_builder.config.fetch_wf_config", lambda *args, **kwargs: mock_config)
+    with pytest.raises(typer.Exit) as exc_info:
+        validate(schema_file)
+    assert exc_info.value.exit_code == 1  # Should fail due to invalid params
+    assert "Invalid parameters" in caplog.text
+
+
+def test_perform_validation_returns_schema_as_on_disk(schema_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that parameters added at the prompt don't end up in the schema that is sent."""
+    mock_config = {"plugins": "nf-schema", "params.test_param": "value", "params.new_param": "42"}
+
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: True)
+    monkeypatch.setattr("nf_schema_builder.config.fetch_wf_config", lambda *args, **kwargs: mock_config)
+    monkeypatch.setattr("nf_schema_builder.validation.Confirm.ask", lambda *args, **kwargs: True)
+    schema = perform_validation(schema_file)
+    assert schema == json.loads(schema_file.read_text())
+    assert "new_param" not in schema.get("properties", {})
 
 
-def test_debug_mode(schema_file: Path) -> None:
+def test_debug_mode(schema_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test debug mode in commands."""
-    with (
-        patch("nf_schema_builder.utils.check_nextflow_installation", return_value=True),
-        patch("nf_schema_builder.utils.fetch_wf_config", return_value={}),
-        patch("nf_schema_builder.cli.set_debug") as mock_set_debug,
-    ):
-        runner.invoke(app, ["validate", str(schema_file), "--debug"], catch_exceptions=False)
-        mock_set_debug.assert_called_once_with(True)
+    debug_calls: list[bool] = []
+
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: True)
+    monkeypatch.setattr("nf_schema_builder.config.fetch_wf_config", lambda *args, **kwargs: {})
+    monkeypatch.setattr("nf_schema_builder.cli.set_debug", debug_calls.append)
+    with contextlib.suppress(typer.Exit):
+        validate(schema_file, debug=True)
+    assert debug_calls == [True]
+
+
+def test_handle_cli_error_subclass(caplog: pytest.LogCaptureFixture) -> None:
+    """Test that error subclasses get the message of their base class."""
+    with pytest.raises(typer.Exit):
+        handle_cli_error(ConnectionRefusedError("refused"))
+    assert "Failed to connect to server: refused" in caplog.text
@@ -1,74 +1,90 @@
 """Tests for config.py module."""
 
 from pathlib import Path
-from unittest.mock import patch
 
 import pytest
 
 from nf_schema_builder.config import ValidationConfig
 
+DRAFT_2020_12 = "https://json-schema.org/draft/2020-12/schema"
+DRAFT_07 = "https://json-schema.org/draft-07/schema"
 
-@pytest.fixture
-def mock_workflow_config() -> dict[str, str]:
-    """Mock workflow configuration."""
-    return {
-        "plugins": "nf-schema",
-        "validation.help.shortParameter": "h",
-        "validation.help.fullParameter": "help",
-        "validation.help.showHiddenParameter": "showHidden",
-        "validation.defaultIgnoreParams": "['param1', 'param2']",
-    }
-
-
-def test_validation_config_nf_schema(mock_workflow_config: dict[str, str]) -> None:
-    """Test ValidationConfig with nf-schema plugin."""
-    with patch("nf_schema_builder.config.fetch_wf_config", return_value=mock_workflow_config):
-        config = ValidationConfig.from_workflow(Path("/mock/path"))
-
-        assert config.validation_plugin == "nf-schema"
-        assert config.defs_notation == "$defs"
-        assert config.schema_draft == "https://json-schema.org/draft/2020-12/schema"
-        assert "h" in config.ignored_params
-        assert "help" in config.ignored_params
-        assert "showHidden" in config.ignored_params
-        assert "param1" in config.ignored_params
-        assert "param2" in config.ignored_params
-        assert "trace_report_suffix" in config.ignored_params
-
-
-def test_validation_config_nf_validation() -> None:
-    """Test ValidationConfig with nf-validation plugin."""
-    mock_config = {"plugins": "nf-validation", "validationSchemaIgnoreParams": "param1,param2"}
-
-    with patch("nf_schema_builder.config.fetch_wf_config", return_value=mock_config):
-        config = ValidationConfig.from_workflow(Path("/mock/path"))
+NF_SCHEMA_CONFIG = {
+    "plugins": "nf-schema",
+    "validation.help.shortParameter": "h",
+    "validation.help.fullParameter": "help",
+    "validation.help.showHiddenParameter": "showHidden",
+    "validation.defaultIgnoreParams": "['param1', 'param2']",
+}
 
-        assert config.validation_plugin == "nf-validation"
-        assert config.defs_notation == "definitions"
-        assert config.schema_draft == "https://json-schema.org/draft-07/schema"
-        assert "param1" in config.ignored_params
-        assert "param2" in config.ignored_params
-        assert "validationSchemaIgnoreParams" in config.ignored_params
+# Parameters nf-schema ignores when the config doesn't set any
+NF_SCHEMA_DEFAULT_IGNORED = {"help", "helpFull", "showHidden", "trace_report_suffix"}
 
 
-def test_validation_config_no_plugin() -> None:
-    """Test ValidationConfig with no plugin specified."""
-    mock_config = {"plugins": ""}
-
-    with patch("nf_schema_builder.config.fetch_wf_config", return_value=mock_config):
-        config = ValidationConfig.from_workflow(Path("/mock/path"))
-
-        assert config.validation_plugin == "nf-schema"  # default
-        assert config.defs_notation == "$defs"
-        assert config.schema_draft == "https://json-schema.org/draft/2020-12/schema"
-
-
-def test_validation_config_empty_ignored_params() -> None:
-    """Test ValidationConfig with empty ignored parameters."""
-    mock_config = {"plugins": "nf-schema", "validation.defaultIgnoreParams": ""}
-
-    with patch("nf_schema_builder.config.fetch_wf_config", return_value=mock_config):
-        config = ValidationConfig.from_workflow(Path("/mock/path"))
-
+@pytest.fixture
+def mock_workflow_config() -> dict[str, str]:
+    """Mock workflow configuration."""
+    return dict(NF_SCHEMA_CONFIG)
+
+
+@pytest.mark.parametrize(
+    ("wf_config", "plugin", "defs_notation", "schema_draft", "ignored_params"),
+    [
+        pytest.param(
+            NF_SCHEMA_CONFIG,
+            "nf-schema",
+            "$defs",
+            DRAFT_2020_12,
+            {"h", "help", "showHidden", "param1", "param2", "trace_report_suffix"},
+            id="nf-schema",
+        ),
+        pytest.param(
+            {"plugins": "nf-validation", "validationSchemaIgnoreParams": "param1,param2"},
+            "nf-validation",
+            "definitions",
+            DRAFT_07,
+            {"param1", "param2", "validationSchemaIgnoreParams"},
+            id="nf-validation",
+        ),
+        # Defaults to nf-schema when no plugin is specified
+        pytest.param({"plugins": ""}, "nf-schema", "$defs", DRAFT_2020_12, NF_SCHEMA_DEFAULT_IGNORED, id="no-plugin"),
         # Should still contain default ignored parameters
-        assert "trace_report_suffix" in config.ignored_params
+        pytest.param(
+            {"plugins": "nf-schema", "validation.defaultIgnoreParams": ""},
+            "nf-schema",
+            "$defs",
+            DRAFT_2020_12,
+            NF_SCHEMA_DEFAULT_IGNORED,
+            id="empty-ignored-params",
+        ),
+    ],
+)
+def test_validation_config(
+    monkeypatch: pytest.MonkeyPatch,
+    wf_config: dict[str, str],
+    plugin: str,
+    defs_notation: str,
+    schema_draft: str,
+    ignored_params: set[str],
+) -> None:
+    """Test ValidationConfig for each validation plugin setup."""
+    monkeypatch.setattr("nf_schema_builder.config.fetch_wf_config", lambda workflow_dir: wf_config)
+    config = ValidationConfig.from_workflow(Path("/mock/path"))
+
+    assert config.validation_plugin == plugin
+    assert config.defs_notation == defs_notation
+    assert config.schema_draft == schema_draft
+    assert config.ignored_params == ignored_params
+
+
+def test_validation_config_fetches_config_once(
+    mock_workflow_config: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test ValidationConfig.from_workflow only queries Nextflow once."""
+    fetched: list[Path] = []
+    monkeypatch.setattr(
+        "nf_schema_builder.config.fetch_wf_config",
+        lambda workflow_dir: fetched.append(workflow_dir) or mock_workflow_config,
+    )
+    ValidationConfig.from_workflow(Path("/mock/path"))
+    assert fetched == [Path("/mock/path")]
@@ -1,50 +1,112 @@
 """Tests for http.py module."""
 
+import asyncio
+import http.client
 import json
+import shutil
+import threading
+import urllib.request
+from collections.abc import Awaitable, Iterator
 from pathlib import Path
-from unittest.mock import MagicMock, patch
-from urllib.error import URLError
+from typing import Callable, Optional, TypeVar
+from urllib.error import HTTPError, URLError
 
 import pytest
+from aiohttp.test_utils import TestClient, TestServer
 
-from nf_schema_builder.http import send_schema
+import nf_schema_builder.http as schema_http
+from nf_schema_builder.http import (
+    SchemaServer,
+    _normalize_url,
+    _server_url,
+    cleanup_server,
+    close_connections,
+    ensure_server_running,
+    post_json,
+    send_schema,
+)
+from nf_schema_builder.utils import json_dumps
 
+T = TypeVar("T")
 
-@pytest.fixture
-def schema_file(tmp_path) -> Path:
-    """Create a sample schema file for testing."""
+
+@pytest.fixture(scope="session")
+def _http_schema_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Write the sample schema file once per test session."""
     schema = {
         "$schema": "https://json-schema.org/draft/2020-12/schema",
         "title": "Test Schema",
         "type": "object",
         "properties": {"test": {"type": "string"}},
     }
-    file_path = tmp_path / "schema.json"
-    with open(file_path, "w") as f:
-        json.dump(schema, f)
+    file_path = tmp_path_factory.mktemp("http_tpl") / "schema.json"
+    file_path.write_bytes(json_dumps(schema))
     return file_path
 
 
-def test_send_schema_success(schema_file: Path) -> None:
-    """Test successful schema sending."""
-    mock_response = MagicMock()
-    mock_response.read.return_value = b'{"status": "success"}'
-    mock_response.__enter__.return_value = mock_response
+@pytest.fixture
+def schema_file(_http_schema_template: Path, tmp_path: Path) -> Path:
+    """Copy the sample schema file for testing to tmp_path."""
+    return Path(shutil.copy(_http_schema_template, tmp_path / "schema.json"))
+
+
+@pytest.fixture
+def posted(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, bytes]]:
+    """Replace post_json with a stub that records the requests and reports success."""
+    requests: list[tuple[str, bytes]] = []
+
+    def fake_post_json(url: str, data: bytes, timeout: float = 30) -> str:
+        requests.append((url, data))
+        return '{"status": "success"}'
+
+    monkeypatch.setattr("nf_schema_builder.http.post_json", fake_post_json)
+    return requests
+
+
+def raise_error(error: Exception):
+    """Build a stub that fails with the given error."""
+
+    def fake_post_json(*args: object, **kwargs: object) -> str:
+        raise error
 
-    with patch("urllib.request.urlopen", return_value=mock_response):
-        response = send_schema(schema_file, "http://example.com")
-        assert response == '{"status": "success"}'
+    return fake_post_json
 
 
-def test_send_schema_no_scheme(schema_file: Path) -> None:
+def test_send_schema_success(schema_file: Path, posted: list[tuple[str, bytes]]) -> None:
+    """Test successful schema sending."""
+    response = send_schema(schema_file, "http://example.com")
+    assert response == '{"status": "success"}'
+    assert posted[-1][0] == "http://example.com/api/schema"
+
+
+def test_send_schema_no_scheme(schema_file: Path, posted: list[tuple[str, bytes]]) -> None:
     """Test sending schema to URL without scheme."""
-    mock_response = MagicMock()
-    mock_response.read.return_value = b'{"status": "success"}'
-    mock_response.__enter__.return_value = mock_response
+    response = send_schema(schema_file, "example.com")
+    assert response == '{"status": "success"}'
+    assert posted[-1][0] == "http://example.com/api/schema"
+
+
+def test_send_schema_forwards_json_bytes(schema_file: Path, posted: list[tuple[str, bytes]]) -> None:
+    """Test that JSON schema files are sent without being re-serialized."""
+    send_schema(schema_file, "http://example.com")
+    assert posted[-1][1] == schema_file.read_bytes()
+
 
-    with patch("urllib.request.urlopen", return_value=mock_response):
-        response = send_schema(schema_file, "example.com")
-        assert response == '{"status": "success"}'
+def test_send_schema_yaml(tmp_path: Path, posted: list[tuple[str, bytes]]) -> None:
+    """Test that YAML schema files are converted to JSON before sending."""
+    yaml_file = tmp_path / "schema.yaml"
+    yaml_file.write_text("title: Test Schema\ntype: object\n")
+
+    send_schema(yaml_file, "http://example.com")
+    assert json.loads(posted[-1][1]) == {"title": "Test Schema", "type": "object"}
+
+
+def test_send_schema_preloaded(tmp_path: Path, posted: list[tuple[str, bytes]]) -> None:
+    """Test that an already loaded schema is sent without reading the file."""
+    schema = {"title": "Test Schema", "type": "object"}
+
+    send_schema(tmp_path / "missing.json", "http://example.com", schema=schema)
+    assert json.loads(posted[-1][1]) == schema
 
 
 def test_send_schema_invalid_json(tmp_path: Path) -> None:
@@ -57,15 +119,279 @@ def test_send_schema_invalid_json(tmp_path: Path) -> None:
     assert response is None
 
 
-def test_send_schema_connection_error(schema_file: Path) -> None:
+def test_send_schema_connection_error(schema_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test schema sending with connection error."""
-    with patch("urllib.request.urlopen", side_effect=URLError("Connection failed")):
-        response = send_schema(schema_file, "http://example.com")
-        assert response is None
+    monkeypatch.setattr("nf_schema_builder.http.post_json", raise_error(URLError("Connection failed")))
+    response = send_schema(schema_file, "http://example.com")
+    assert response is None
 
 
-def test_send_schema_unexpected_error(schema_file: Path) -> None:
+def test_send_schema_unexpected_error(schema_file: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test schema sending with unexpected error."""
-    with patch("urllib.request.urlopen", side_effect=Exception("Unexpected error")):
-        response = send_schema(schema_file, "http://example.com")
-        assert response is None
+    monkeypatch.setattr("nf_schema_builder.http.post_json", raise_error(Exception("Unexpected error")))
+    response = send_schema(schema_file, "http://example.com")
+    assert response is None
+
+
+class FakeResponse:
+    """Stand-in for http.client.HTTPResponse with a canned body."""
+
+    reason = "OK"
+    headers: dict[str, str] = {}
+
+    def __init__(self, body: bytes, status: int = 200) -> None:
+        """Store the response body and status."""
+        self.body = body
+        self.status = status
+
+    def read(self) -> bytes:
+        """Return the response body."""
+        return self.body
+
+    def __enter__(self) -> "FakeResponse":
+        """Enter the response context."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Leave the response context."""
+
+
+class FakeSocket:
+    """Stand-in for the socket of a connected FakeConnection."""
+
+    timeout: Optional[float] = None
+
+    def settimeout(self, timeout: float) -> None:
+        """Record the socket timeout."""
+        self.timeout = timeout
+
+
+class FakeConnection:
+    """Stand-in for http.client.HTTPConnection that records its requests."""
+
+    # Errors raised by upcoming requests on any connection, a None entry lets that request succeed
+    errors: list[Optional[Exception]] = []
+    status = 200
+
+    def __init__(self, host: str, port: int, timeout: float) -> None:
+        """Record the connection target."""
+        self.target = (host, port, timeout)
+        self.timeout = timeout
+        self.sock: Optional[FakeSocket] = None
+        self.requests: list[tuple[str, str, bytes]] = []
+
+    def request(self, method: str, url: str, body: bytes, headers: dict[str, str]) -> None:
+        """Record the request, connecting on first use."""
+        error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        if self.sock is None:
+            self.sock = FakeSocket()
+        self.requests.append((method, url, body))
+
+    def getresponse(self) -> FakeResponse:
+        """Return a response with the configured status."""
+        return FakeResponse(b'{"status": "success"}', self.status)
+
+    def close(self) -> None:
+        """Drop the connection."""
+        self.sock = None
+
+
+@pytest.fixture
+def connections(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[FakeConnection]]:
+    """Replace HTTPConnection with FakeConnection and record the connections opened, with no proxy configured."""
+    opened: list[FakeConnection] = []
+
+    def connect(host: str, port: int, timeout: float) -> FakeConnection:
+        opened.append(FakeConnection(host, port, timeout))
+        return opened[-1]
+
+    close_connections()
+    monkeypatch.setattr("http.client.HTTPConnection", connect)
+    monkeypatch.setattr("urllib.request.getproxies", dict)
+    monkeypatch.setattr(FakeConnection, "errors", [])
+    yield opened
+    close_connections()
+
+
+def test_post_json_reuses_connection(connections: list[FakeConnection]) -> None:
+    """Test that consecutive posts to the local server share one keep-alive connection."""
+    assert post_json("http://localhost:5173/api/schema", b"{}") == '{"status": "success"}'
+    assert post_json("http://localhost:5173/api/schema", b"{}", timeout=5) == '{"status": "success"}'
+    assert [conn.target for conn in connections] == [("localhost", 5173, 30)]
+    assert len(connections[0].requests) == 2
+    assert connections[0].timeout == 5
+    assert connections[0].sock is not None and connections[0].sock.timeout == 5
+
+
+def test_post_json_retries_dropped_connection(connections: list[FakeConnection]) -> None:
+    """Test that a post on a keep-alive connection the server closed is retried once on a new connection."""
+    post_json("http://localhost:5173/api/schema", b"{}")
+    FakeConnection.errors = [http.client.RemoteDisconnected("closed")]
+    assert post_json("http://localhost:5173/api/schema", b"{}") == '{"status": "success"}'
+    assert [len(conn.requests) for conn in connections] == [1, 1]
+
+
+def test_post_json_no_retry_on_timeout(connections: list[FakeConnection]) -> None:
+    """Test that a timed out post isn't sent again, as the server may already have handled it."""
+    post_json("http://localhost:5173/api/schema", b"{}")
+    FakeConnection.errors = [TimeoutError("timed out")]
+    with pytest.raises(TimeoutError):
+        post_json("http://localhost:5173/api/schema", b"{}")
+    assert len(connections) == 1
+
+
+def test_post_json_redirect_is_error(connections: list[FakeConnection], monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a redirect from the local server isn't taken for success."""
+    monkeypatch.setattr(FakeConnection, "status", 302)
+    with pytest.raises(HTTPError):
+        post_json("http://localhost:5173/api/schema", b"{}")
+
+
+@pytest.mark.parametrize(
+    ("url", "proxies"),
+    [
+        ("http://example.com/api/schema", {}),
+        ("http://localhost:5173/api/schema", {"http": "http://proxy:3128"}),
+    ],
+    ids=["remote-host", "proxy"],
+)
+def test_post_json_urllib(
+    connections: list[FakeConnection], monkeypatch: pytest.MonkeyPatch, url: str, proxies: dict[str, str]
+) -> None:
+    """Test that remote hosts and proxied requests go through urllib."""
+    sent: list[tuple[str, float]] = []
+
+    def urlopen(req: urllib.request.Request, timeout: float) -> FakeResponse:
+        sent.append((req.full_url, timeout))
+        return FakeResponse(b'{"status": "success"}')
+
+    monkeypatch.setattr("urllib.request.getproxies", lambda: proxies)
+    monkeypatch.setattr("urllib.request.proxy_bypass", lambda host: False)
+    monkeypatch.setattr("urllib.request.urlopen", urlopen)
+    assert post_json(url, b"{}") == '{"status": "success"}'
+    assert sent == [(url, 30)]
+    assert connections == []
+
+
+def test_normalize_url() -> None:
+    """Test URL normalization and local server detection."""
+    assert _normalize_url("localhost:5173") == ("http://localhost:5173/api/schema", True)
+    assert _normalize_url("http://127.0.0.1:8080/") == ("http://127.0.0.1:8080/api/schema", True)
+    assert _normalize_url("https://example.com/api/schema") == ("https://example.com/api/schema", False)
+    assert _normalize_url("http://[::1]:5173") == ("http://[::1]:5173/api/schema", True)
+    assert _normalize_url("http://localhost.example.com") == ("http://localhost.example.com/api/schema", False)
+
+
+def test_server_url() -> None:
+    """Test that IPv6 addresses are put in brackets in the server URL."""
+    assert _server_url("localhost", 5173) == "http://localhost:5173"
+    assert _server_url("127.0.0.1", 5173) == "http://127.0.0.1:5173"
+    assert _server_url("::1", 5173) == "http://[::1]:5173"
+
+
+@pytest.fixture
+def static_dir(tmp_path: Path) -> Path:
+    """Create a minimal GUI build with an index page and one hashed asset."""
+    static = tmp_path / "dist"
+    (static / "assets").mkdir(parents=True)
+    (static / "index.html").write_text("<html>schema builder</html>")
+    (static / "assets" / "index-3f2a1b.js").write_text("console.log('gui')")
+    return static
+
+
+@pytest.fixture
+def server(static_dir: Path, schema_file: Path) -> SchemaServer:
+    """Create a schema server for the test schema, serving the minimal GUI build."""
+    return SchemaServer("127.0.0.1", 0, schema_file=schema_file, static_path=static_dir)
+
+
+def run_client(server: SchemaServer, requests: Callable[[TestClient], Awaitable[T]]) -> T:
+    """Run requests against the server's application on a test client."""
+
+    async def main() -> T:
+        async with TestClient(TestServer(server.app)) as client:
+            return await requests(client)
+
+    return asyncio.run(main())
+
+
+def test_serve_index_etag(server: SchemaServer) -> None:
+    """Test that the index page is revalidated with its ETag."""
+
+    async def requests(client: TestClient) -> tuple[int, int, dict[str, str], str]:
+        response = await client.get("/")
+        body = await response.text()
+        cached = await client.get("/", headers={"If-None-Match": response.headers["ETag"]})
+        return response.status, cached.status, dict(response.headers), body
+
+    status, cached_status, headers, body = run_client(server, requests)
+    assert (status, cached_status) == (200, 304)
+    assert headers["Cache-Control"] == "no-cache"
+    assert body == "<html>schema builder</html>"
+
+
+def test_assets_cache_control(server: SchemaServer) -> None:
+    """Test that found assets may be cached for good and missing ones may not."""
+
+    async def requests(client: TestClient) -> list[tuple[int, Optional[str]]]:
+        responses = [await client.get(path) for path in ("/assets/index-3f2a1b.js", "/assets/missing.js")]
+        return [(response.status, response.headers.get("Cache-Control")) for response in responses]
+
+    assert run_client(server, requests) == [(200, "public, max-age=31536000, immutable"), (404, None)]
+
+
+def test_save_schema(server: SchemaServer, schema_file: Path) -> None:
+    """Test that saved schemas replace the schema file and are served back."""
+    schema = {"title": "Saved Schema", "properties": {"outdir": {"type": "string"}}}
+
+    async def requests(client: TestClient) -> tuple[int, dict]:
+        response = await client.post("/api/schema", data=json_dumps(schema))
+        return response.status, await (await client.get("/api/schema")).json()
+
+    status, served = run_client(server, requests)
+    assert status == 200
+    assert server.schema_saved.is_set()
+    assert schema_file.read_bytes() == json_dumps(schema, indent=True)
+    assert served["data"] == schema
+    assert list(schema_file.parent.glob(f".{schema_file.name}.*")) == []
+
+
+def test_finish_stops_server(server: SchemaServer) -> None:
+    """Test that finish() called from another thread shuts the running server down."""
+    thread = threading.Thread(target=asyncio.run, args=(server.start(),), daemon=True)
+    thread.start()
+    assert server.ready.wait(5)
+
+    server.finish()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert server.finished.is_set()
+    assert server._runner is None
+
+
+def test_ensure_server_running_fast_path(server: SchemaServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a server known to be up is reused without starting another one."""
+    monkeypatch.setattr(schema_http, "_server_instance", server)
+    monkeypatch.setattr(schema_http, "_server_thread", None)
+    monkeypatch.setattr(schema_http, "_server_alive", True)
+    monkeypatch.setattr(schema_http, "SchemaServer", raise_error(AssertionError("started a new server")))
+    assert ensure_server_running("localhost:5173", no_browser=True)
+
+    # Once finished, the fast path no longer applies and a new server is created
+    server.finish()
+    monkeypatch.setattr(schema_http, "SchemaServer", raise_error(RuntimeError("started a new server")))
+    with pytest.raises(RuntimeError):
+        ensure_server_running("localhost:5173")
+
+
+def test_cleanup_server(server: SchemaServer, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that cleaning up finishes the current server and resets the server state."""
+    monkeypatch.setattr(schema_http, "_server_instance", server)
+    monkeypatch.setattr(schema_http, "_server_thread", threading.Thread(target=lambda: None))
+    monkeypatch.setattr(schema_http, "_server_alive", True)
+
+    cleanup_server()
+    assert server.finished.is_set()
+    assert (schema_http._server_instance, schema_http._server_thread, schema_http._server_alive) == (None, None, False)
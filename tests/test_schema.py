@@ -0,0 +1,88 @@
+"""Tests for schema.py module."""
+
+from typing import Any
+
+import pytest
+
+from nf_schema_builder.schema import SchemaValidator
+
+SCHEMA = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {
+        "outdir": {"type": "string", "pattern": "^\\S+$"},
+        "hidden_param": {"type": "integer", "hidden": True},
+    },
+    "$defs": {
+        "options": {
+            "properties": {
+                "max_cpus": {"type": "integer", "minimum": 1},
+                "mode": {"type": "string", "enum": ["fast", "slow"]},
+                "skip_qc": {"type": "boolean"},
+                "ratio": {"type": ["number", "null"], "maximum": 1},
+            }
+        }
+    },
+    "allOf": [{"$ref": "#/$defs/options"}],
+}
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"outdir": "results", "max_cpus": 4, "mode": "fast", "skip_qc": True, "ratio": 0.5},
+        {"outdir": "my results", "max_cpus": 0, "mode": "medium", "skip_qc": "yes", "ratio": 2},
+        {"max_cpus": "four", "outdir": 42, "unknown": "value", "mode": "null"},
+        {"hidden_param": "not a number", "ratio": None, "skip_qc": "null"},
+        {"unknown": "value", "other_unknown": 1, "max_cpus": -1},
+        {},
+    ],
+    ids=["valid", "invalid", "wrong-types", "hidden-and-null", "unknown-first", "empty"],
+)
+def test_validate_parameters_matches_validate_parameter(params: dict[str, Any]) -> None:
+    """Test that validating parameters in one pass gives the same errors, in the same order, as one by one."""
+    validator = SchemaValidator(SCHEMA)
+    expected = {}
+    for param_name, value in params.items():
+        is_valid, error = validator.validate_parameter(param_name, value)
+        if not is_valid:
+            expected[param_name] = error
+
+    invalid_params = validator.validate_parameters(params)
+    assert invalid_params == expected
+    assert list(invalid_params) == list(expected)
+
+
+@pytest.mark.parametrize(
+    ("value", "param_type"),
+    [
+        ("true", "boolean"),
+        ("False", "boolean"),
+        ("42", "integer"),
+        ("-3", "integer"),
+        ("0.5", "number"),
+        ("-2.5", "number"),
+        ("1e5", "number"),
+        ("inf", "string"),
+        ("nan", "string"),
+        ("1.2.3", "string"),
+        ("results", "string"),
+        ("", "string"),
+    ],
+)
+def test_add_parameter_infers_type(value: str, param_type: str) -> None:
+    """Test the type inferred for a parameter added from its default value."""
+    validator = SchemaValidator({"properties": {}})
+    validator.add_parameter("new_param", value)
+    assert validator.schema["properties"]["new_param"] == {"type": param_type, "description": "Parameter new_param"}
+    assert validator.find_parameter("new_param") == {"type": param_type, "description": "Parameter new_param"}
+
+
+def test_add_parameter_copies_schema() -> None:
+    """Test that adding parameters leaves the schema passed in unchanged."""
+    schema = {"properties": {"outdir": {"type": "string"}}}
+    validator = SchemaValidator(schema)
+    validator.add_parameter("first", "1")
+    validator.add_parameter("second", "true")
+    assert schema == {"properties": {"outdir": {"type": "string"}}}
+    assert list(validator.schema["properties"]) == ["outdir", "first", "second"]
@@ -1,88 +1,232 @@
 """Tests for utils.py module."""
 
+import io
+import shutil
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from typing import Optional
 
 import pytest
 import typer
 
-from nf_schema_builder.utils import check_nextflow_installation, fetch_wf_config
+from nf_schema_builder.utils import (
+    CacheManager,
+    ConfigParser,
+    check_nextflow_installation,
+    fetch_wf_config,
+    json_dumps,
+    json_loads,
+    load_json_file,
+    write_bytes_atomic,
+)
+
+
+@pytest.mark.parametrize(
+    ("which_result", "installed"),
+    [("/usr/local/bin/nextflow", True), (None, False)],
+    ids=["installed", "not-on-path"],
+)
+def test_check_nextflow_installation(
+    monkeypatch: pytest.MonkeyPatch, which_result: Optional[str], installed: bool
+) -> None:
+    """Test Nextflow installation check, looking up PATH only once."""
+    lookups: list[str] = []
+    monkeypatch.setattr("nf_schema_builder.utils.shutil.which", lambda cmd: lookups.append(cmd) or which_result)
+
+    check_nextflow_installation.cache_clear()
+    assert [check_nextflow_installation(), check_nextflow_installation()] == [installed, installed]
+    assert lookups == ["nextflow"]
+    check_nextflow_installation.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def _wf_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Create mock workflow files once per test session."""
+    wf_dir = tmp_path_factory.mktemp("wf")
 
-
-def test_check_nextflow_installation() -> None:
-    """Test Nextflow installation check."""
-    with patch("nf_schema_builder.utils.run") as mock_run:
-        # Test successful installation
-        mock_run.reset_mock()
-        mock_process = MagicMock()
-        mock_process.returncode = 0
-        mock_run.return_value = mock_process
-        assert check_nextflow_installation() is True
-        mock_run.assert_called_once_with(["nextflow", "-version"], capture_output=True)
-
-        # Test failed installation
-        mock_run.reset_mock()
-        mock_process = MagicMock()
-        mock_process.returncode = 1
-        mock_run.return_value = mock_process
-        assert check_nextflow_installation() is False
-        mock_run.assert_called_once_with(["nextflow", "-version"], capture_output=True)
-
-        # Test FileNotFoundError
-        mock_run.reset_mock()
-        mock_run.side_effect = FileNotFoundError()
-        assert check_nextflow_installation() is False
-
-
-@pytest.fixture
-def mock_workflow_files(tmp_path: Path) -> Path:
-    """Create mock workflow files for testing."""
     # Create nextflow.config
     config_content = """
     params.test = 'value'
     params.number = 42
     plugins = 'nf-schema'
     """
-    config_file = tmp_path / "nextflow.config"
-    config_file.write_text(config_content)
+    (wf_dir / "nextflow.config").write_text(config_content)
 
     # Create main.nf
     main_content = """
     params.additional = null
     """
-    main_file = tmp_path / "main.nf"
-    main_file.write_text(main_content)
+    (wf_dir / "main.nf").write_text(main_content)
+
+    return wf_dir
+
+
+@pytest.fixture
+def mock_workflow_files(_wf_template: Path, tmp_path: Path) -> Path:
+    """Copy the mock workflow files for testing to tmp_path."""
+    return Path(shutil.copytree(_wf_template, tmp_path / "wf"))
+
+
+# Config parsed from the FakePopen output and the mock main.nf
+EXPECTED_CFG = {
+    "params.test": "value",
+    "params.number": "42",
+    "plugins": "nf-schema",
+    "params.additional": "null",
+}
+
+
+class FakePopen:
+    """Stand-in for subprocess.Popen replaying the output of `nextflow config -flat`."""
+
+    output = "params.test = 'value'\nparams.number = 42\nplugins = 'nf-schema'\n"
+    commands: list[list[str]] = []
+
+    def __init__(self, args: list[str], **kwargs: object) -> None:
+        """Record the command and prepare its output."""
+        self.commands.append(args)
+        self.stdout = io.StringIO(self.output)
+        self.returncode = 0
+
+    def __enter__(self) -> "FakePopen":
+        """Enter the process context."""
+        return self
 
-    return tmp_path
+    def __exit__(self, *exc_info: object) -> None:
+        """Close the output stream."""
+        self.stdout.close()
 
 
-def test_fetch_wf_config(mock_workflow_files: Path, tmp_path: Path) -> None:
+def test_fetch_wf_config(mock_workflow_files: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test fetching workflow configuration."""
-    with (
-        patch("nf_schema_builder.utils.check_nextflow_installation") as mock_check,
-        patch("nf_schema_builder.utils.run_cmd") as mock_run,
-    ):
-        mock_check.return_value = True
-        mock_run.return_value = (b"params.test = 'value'\nparams.number = 42\nplugins = 'nf-schema'\n", b"")
-
-        # Test with cache disabled
-        config = fetch_wf_config(mock_workflow_files, cache_config=False)
-        assert isinstance(config, dict)
-        assert config["params.test"] == "value"
-        assert config["params.number"] == "42"
-        assert config["plugins"] == "nf-schema"
-
-        # Test with cache enabled
-        config = fetch_wf_config(mock_workflow_files, cache_config=True)
-        assert isinstance(config, dict)
-        assert config["params.test"] == "value"
-        assert config["params.number"] == "42"
-        assert config["plugins"] == "nf-schema"
-
-
-def test_fetch_wf_config_no_nextflow(mock_workflow_files: Path) -> None:
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: True)
+    monkeypatch.setattr("nf_schema_builder.utils.Popen", FakePopen)
+    monkeypatch.setattr(FakePopen, "commands", [])
+    monkeypatch.setattr("nf_schema_builder.utils._wf_config_memo", {})
+
+    # Test with cache disabled
+    config = fetch_wf_config(mock_workflow_files, cache_config=False)
+    assert config == EXPECTED_CFG
+
+    # Test with cache enabled, the first call runs Nextflow and fills the cache
+    config = fetch_wf_config(mock_workflow_files, cache_config=True)
+    assert config == EXPECTED_CFG
+    assert len(FakePopen.commands) == 2
+
+    # Test repeated calls are served from the in-process memo, then from the cache file
+    assert fetch_wf_config(mock_workflow_files, cache_config=True) == EXPECTED_CFG
+    monkeypatch.setattr("nf_schema_builder.utils._wf_config_memo", {})
+    assert fetch_wf_config(mock_workflow_files, cache_config=True) == EXPECTED_CFG
+    assert len(FakePopen.commands) == 2
+
+
+@pytest.mark.parametrize(
+    ("line", "expected"),
+    [
+        ("params.test = 'value'", ("params.test", "value")),
+        ('params.test = "value"', ("params.test", "value")),
+        ("params.test=value", ("params.test", "value")),
+        ("  params.test  =  two words  ", ("params.test", "two words")),
+        ("params.test = a=b", ("params.test", "a=b")),
+        ("params.test = ''nested''", ("params.test", "'nested'")),
+        ("params.test = ''", ("params.test", "")),
+        ("params.test = 'open", ("params.test", "'open")),
+        ("params.test = close'", ("params.test", "close'")),
+        ("params.test = 'mixed\"", ("params.test", "'mixed\"")),
+        ("no assignment", (None, None)),
+    ],
+    ids=[
+        "single-quotes",
+        "double-quotes",
+        "no-spaces",
+        "padded",
+        "equals-in-value",
+        "one-pair-stripped",
+        "empty-string",
+        "unbalanced-open",
+        "unbalanced-close",
+        "mismatched-quotes",
+        "no-assignment",
+    ],
+)
+def test_parse_config_line(line: str, expected: tuple[Optional[str], Optional[str]]) -> None:
+    """Test parsing lines of `nextflow config -flat` output."""
+    assert ConfigParser.parse_config_line(line) == expected
+
+
+def test_fetch_wf_config_no_nextflow(mock_workflow_files: Path, monkeypatch: pytest.MonkeyPatch) -> None:
     """Test fetching workflow configuration without Nextflow installed."""
-    with patch("nf_schema_builder.utils.check_nextflow_installation") as mock_check:
-        mock_check.return_value = False
-        with pytest.raises(typer.Exit):
-            fetch_wf_config(mock_workflow_files)
+    monkeypatch.setattr("nf_schema_builder.utils.check_nextflow_installation", lambda: False)
+    with pytest.raises(typer.Exit):
+        fetch_wf_config(mock_workflow_files)
+
+
+def test_json_roundtrip() -> None:
+    """Test JSON helpers produce bytes and parse them back."""
+    data = {"title": "Test Schema", "properties": {"test": {"type": "string"}}}
+    assert isinstance(json_dumps(data), bytes)
+    assert json_loads(json_dumps(data)) == data
+    assert json_dumps(data, indent=True).startswith(b'{\n  "title"')
+
+
+@pytest.mark.parametrize("indent", [False, True])
+def test_json_dumps_backends_match(monkeypatch: pytest.MonkeyPatch, indent: bool) -> None:
+    """Test that the json fallback writes the same bytes as orjson."""
+    pytest.importorskip("orjson")
+    data = {"title": "Schéma", "properties": {"test": {"type": "string", "default": [1, 2.5, None, True]}}}
+    expected = json_dumps(data, indent=indent)
+    monkeypatch.setattr("nf_schema_builder.utils.orjson", None)
+    assert json_dumps(data, indent=indent) == expected
+    assert "Schéma".encode() in expected
+
+
+def test_load_json_file_mmap(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test loading JSON files both below and above the memory-map threshold."""
+    data = {"properties": {"test": {"type": "string"}}}
+    schema_path = tmp_path / "schema.json"
+    schema_path.write_bytes(json_dumps(data))
+
+    assert load_json_file(schema_path) == data
+    monkeypatch.setattr("nf_schema_builder.utils.MMAP_THRESHOLD", 1)
+    assert load_json_file(schema_path) == data
+
+
+def test_write_bytes_atomic(tmp_path: Path) -> None:
+    """Test atomic writes replace the file contents and keep its permissions."""
+    target = tmp_path / "nextflow_schema.json"
+    target.write_text("{}")
+    target.chmod(0o640)
+
+    write_bytes_atomic(target, b'{"title": "Test Schema"}')
+    assert target.read_bytes() == b'{"title": "Test Schema"}'
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_write_bytes_atomic_symlink(tmp_path: Path) -> None:
+    """Test atomic writes through a symlink update its target and keep the link."""
+    target = tmp_path / "shared" / "nextflow_schema.json"
+    target.parent.mkdir()
+    target.write_text("{}")
+    link = tmp_path / "nextflow_schema.json"
+    link.symlink_to(target)
+
+    write_bytes_atomic(link, b'{"title": "Test Schema"}')
+    assert link.is_symlink()
+    assert target.read_bytes() == b'{"title": "Test Schema"}'
+    assert sorted(path.name for path in tmp_path.rglob("*")) == [
+        "nextflow_schema.json",
+        "nextflow_schema.json",
+        "shared",
+    ]
+
+
+def test_schema_check_marker(tmp_path: Path) -> None:
+    """Test schema check markers are keyed by schema content and draft."""
+    cache_manager = CacheManager(cache_dir=tmp_path)
+    schema = {"type": "object", "properties": {"test": {"type": "string"}}}
+
+    assert not cache_manager.is_schema_checked(schema, "Draft202012Validator")
+    cache_manager.mark_schema_checked(schema, "Draft202012Validator")
+    assert cache_manager.is_schema_checked(schema, "Draft202012Validator")
+    assert not cache_manager.is_schema_checked(schema, "Draft7Validator")
+    assert not cache_manager.is_schema_checked({"type": "object"}, "Draft202012Validator")
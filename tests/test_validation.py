@@ -0,0 +1,89 @@
+"""Tests for validation.py module."""
+
+import copy
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+import pytest
+from jsonschema import Draft202012Validator
+
+from nf_schema_builder import validation
+from nf_schema_builder.config import ValidationConfig, WorkflowConfig
+from nf_schema_builder.validation import get_validator, validate_workflow_parameters
+
+SCHEMA: dict[str, Any] = {
+    "$schema": "https://json-schema.org/draft/2020-12/schema",
+    "type": "object",
+    "properties": {"test": {"type": "string"}},
+}
+
+
+def test_get_validator_skips_checked_schema(_isolated_cache: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a schema with a check marker isn't checked against the meta-schema again."""
+    checked: list[dict] = []
+    monkeypatch.setattr(Draft202012Validator, "check_schema", checked.append)
+    monkeypatch.setattr("nf_schema_builder.validation._checked_schemas", OrderedDict())
+
+    assert isinstance(get_validator(copy.deepcopy(SCHEMA)), Draft202012Validator)
+    assert checked == [SCHEMA]
+    assert len(list(_isolated_cache.glob("schema-*.ok"))) == 1
+
+    # A new process only has the marker file to go by
+    monkeypatch.setattr("nf_schema_builder.validation._checked_schemas", OrderedDict())
+    assert isinstance(get_validator(copy.deepcopy(SCHEMA)), Draft202012Validator)
+    assert checked == [SCHEMA]
+
+
+def test_get_validator_without_cache_dir(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that schemas are still checked when the cache directory can't be created."""
+    checked: list[dict] = []
+
+    def unwritable_cache() -> None:
+        raise PermissionError("Permission denied")
+
+    monkeypatch.setattr(Draft202012Validator, "check_schema", checked.append)
+    monkeypatch.setattr("nf_schema_builder.validation._checked_schemas", OrderedDict())
+    monkeypatch.setattr("nf_schema_builder.validation.CacheManager", unwritable_cache)
+
+    assert isinstance(get_validator(copy.deepcopy(SCHEMA)), Draft202012Validator)
+    assert checked == [SCHEMA]
+
+
+def test_get_validator_bounded_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that checked schemas are remembered by content, up to a fixed number of them."""
+    checked: list[dict] = []
+    monkeypatch.setattr(Draft202012Validator, "check_schema", checked.append)
+    monkeypatch.setattr("nf_schema_builder.validation._checked_schemas", OrderedDict())
+    monkeypatch.setattr("nf_schema_builder.validation._CHECKED_SCHEMAS_SIZE", 2)
+
+    schema = copy.deepcopy(SCHEMA)
+    get_validator(schema)
+    get_validator(copy.deepcopy(SCHEMA))
+    assert len(checked) == 1
+
+    # A changed schema is a different cache entry, and the oldest entry is dropped once the cache is full
+    schema["properties"]["other"] = {"type": "integer"}
+    get_validator(schema)
+    get_validator({**SCHEMA, "title": "Third"})
+    assert len(checked) == 3
+    assert len(validation._checked_schemas) == 2
+
+
+def test_validate_workflow_parameters_error_order(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that invalid and unknown parameters are reported in the order of the workflow config."""
+    wf_config = WorkflowConfig(
+        {
+            "params.unknown": "value",
+            "params.test": "ok",
+            "params.count": "many",
+            "params.other_unknown": "value",
+        }
+    )
+    schema = {**SCHEMA, "properties": {"test": {"type": "string"}, "count": {"type": "integer"}}}
+    monkeypatch.setattr("nf_schema_builder.validation.Confirm.ask", lambda *args, **kwargs: False)
+
+    invalid_params = validate_workflow_parameters(schema, ValidationConfig(wf_config=wf_config))
+    assert invalid_params is not None
+    assert list(invalid_params) == ["unknown", "count", "other_unknown"]
+    assert invalid_params["unknown"] == "Parameter not defined in schema"